@@ -0,0 +1,204 @@
+"""
+Research Agent Checkpoints
+Local JSON snapshot of a research agent run (searches issued, their
+observations, the agent's reasoning, budget usage and the citation ids the
+observations use), saved after every iteration so a run interrupted by a
+rerun or restart resumes instead of paying for its searches again
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
+
+from langchain_core.agents import AgentAction
+
+from AI.citation_registry import CITATION_ID_PATTERN, remap_citation_ids
+from keys.config import AGENT_CHECKPOINT_DIR, AGENT_CHECKPOINT_MAX_AGE_SECONDS
+
+
+CHECKPOINT_VERSION = 2
+
+RESUME_INSTRUCTIONS = """**RESEARCH ALREADY GATHERED (this run was interrupted and is resuming):**
+{steps}
+
+Continue from here: do not repeat these searches. Search only for what is still missing, then write the Final Answer."""
+
+
+def checkpoint_key(step_name: str, agent_input: str, session_id: Optional[str] = None) -> str:
+    """Checkpoints are keyed on the session, the step and the exact research input"""
+    return hashlib.sha256(f"{session_id}\n{step_name}\n{agent_input}".encode("utf-8")).hexdigest()[:24]
+
+
+class AgentCheckpoint:
+    """Checkpoint file for one research task of one session (step + instructions + context)"""
+
+    def __init__(self, step_name: str, agent_input: str, session_id: Optional[str] = None,
+                 directory: str = AGENT_CHECKPOINT_DIR, max_age_seconds: int = AGENT_CHECKPOINT_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        safe_step = "".join(c if c.isalnum() or c in "-_" else "_" for c in step_name)
+        key = checkpoint_key(step_name, agent_input, session_id)
+        self.path = os.path.join(directory, f"{safe_step}-{key}.json")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Saved state, or None if there is no usable checkpoint"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable agent checkpoint {self.path}: {e}")
+            return None
+
+        if state.get("version") != CHECKPOINT_VERSION:
+            return None
+        if self.max_age_seconds and time.time() - state.get("saved_at", 0) > self.max_age_seconds:
+            self.delete()
+            return None
+        return state
+
+    def save(self, intermediate_steps: List[Any], query_memory=None, tracker=None, compressor=None,
+             citation_registry=None):
+        """
+        Write the run's progress (atomically, so a crash mid-write keeps the previous checkpoint)
+
+        Args:
+            intermediate_steps: (action, observation) pairs so far
+            query_memory: Run query memory (per-query observations)
+            tracker: Run tracker (budget usage carried into the resumed run)
+            compressor: Run observation compressor; full observations are saved
+            citation_registry: Session citation registry; the [Cx] ids the saved
+                               steps and observations use are saved with their URLs
+        """
+        steps = [
+            {
+                "tool": getattr(action, "tool", "search"),
+                "tool_input": getattr(action, "tool_input", ""),
+                "log": getattr(action, "log", ""),
+                "observation": compressor.expand(str(observation)) if compressor else str(observation)
+            }
+            for action, observation in intermediate_steps
+        ]
+        queries = [
+            [query, observation] for query, _, _, observation in list(query_memory.entries)
+        ] if query_memory is not None else []
+
+        citations = {}
+        if citation_registry is not None:
+            texts = [step["log"] for step in steps] + [step["observation"] for step in steps]
+            texts += [observation for _, observation in queries]
+            cited = {citation_id for text in texts for citation_id in CITATION_ID_PATTERN.findall(str(text))}
+            citations = {
+                citation_id: url for citation_id, url in list(citation_registry.urls.items()) if citation_id in cited
+            }
+
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "saved_at": time.time(),
+            "steps": steps,
+            "queries": queries,
+            "usage": tracker.usage() if tracker is not None else {},
+            "citations": citations
+        }
+
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # A unique temp file per save: concurrent saves must not write into each other's file
+        temp_file = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False)
+        try:
+            with temp_file:
+                json.dump(state, temp_file, default=str)
+            os.replace(temp_file.name, self.path)
+        except Exception:
+            os.remove(temp_file.name)
+            raise
+
+    def delete(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error deleting agent checkpoint {self.path}: {e}")
+
+
+def prune_checkpoints(directory: str = AGENT_CHECKPOINT_DIR,
+                      max_age_seconds: int = AGENT_CHECKPOINT_MAX_AGE_SECONDS) -> int:
+    """
+    Delete checkpoints older than max_age_seconds (those of ended sessions are never loaded again)
+
+    Returns:
+        Number of checkpoints deleted
+    """
+    if not max_age_seconds:
+        return 0
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+
+    deleted = 0
+    cutoff = time.time() - max_age_seconds
+    for name in names:
+        if not name.endswith((".json", ".tmp")):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                deleted += 1
+        except OSError:
+            pass
+    return deleted
+
+
+def restore_citations(state: Dict[str, Any], citation_registry=None) -> Dict[str, str]:
+    """
+    Re-seed the session citation registry with the checkpoint's citations
+
+    After a restart the registry no longer knows the ids in the saved
+    observations; ids that now belong to other URLs are renumbered.
+
+    Returns:
+        {saved id: session id} for ids that changed (see remap_citation_ids)
+    """
+    if citation_registry is None:
+        return {}
+    return citation_registry.restore(state.get("citations", {}))
+
+
+def restore_steps(state: Dict[str, Any], remap: Optional[Dict[str, str]] = None) -> List[tuple]:
+    """Saved steps as (AgentAction, observation) pairs, with citation ids remapped"""
+    steps = []
+    for step in state.get("steps", []):
+        tool_input = step.get("tool_input", "")
+        if not isinstance(tool_input, (str, dict)):
+            tool_input = json.dumps(tool_input)
+        steps.append((
+            AgentAction(tool=step.get("tool", "search"), tool_input=tool_input,
+                        log=remap_citation_ids(step.get("log", ""), remap)),
+            remap_citation_ids(step.get("observation", ""), remap)
+        ))
+    return steps
+
+
+def resume_input(agent_input: str, steps: List[tuple], compressor=None) -> str:
+    """Agent input extended with the research gathered before the interruption"""
+    if not steps:
+        return agent_input
+
+    sections = []
+    for action, observation in steps:
+        # ReAct logs carry the Thought before "Action:"; tool-calling logs only echo the call
+        thought = action.log.split("Action:", 1)[0].strip() if "Action:" in (action.log or "") else ""
+        section = f"### {action.tool}: {action.tool_input}\n"
+        if thought:
+            section += f"{thought}\n"
+        section += compressor.compress(action.tool_input, observation) if compressor else observation
+        sections.append(section)
+
+    gathered = "\n\n".join(sections)
+    return f"{agent_input}\n{RESUME_INSTRUCTIONS.format(steps=gathered)}\n"
@@ -0,0 +1,113 @@
+"""
+Research Agent Live Status
+Callback handler that streams the agent's Thought / Action / Observation steps
+into a Streamlit status container while the run is in progress
+"""
+
+import re
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.callbacks import BaseCallbackHandler
+
+from AI.agent_tracking import AgentRunTracker
+
+
+OBSERVATION_PREVIEW_CHARS = 240
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _thought_from_action(action: AgentAction) -> str:
+    """The model's reasoning text that preceded the tool call"""
+    # Native tool calls carry the model message; ReAct actions only have the raw text log
+    message_log = getattr(action, "message_log", None)
+    if message_log:
+        content = message_log[-1].content
+        if isinstance(content, list):
+            content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+        return str(content).strip()
+
+    thought = (action.log or "").split("Action:", 1)[0]
+    return thought.replace("Thought:", "").strip()
+
+
+class StreamlitAgentStatusHandler(BaseCallbackHandler):
+    """
+    Writes a short summary of each agent step into an st.status container
+
+    The container label shows elapsed time and searches used so far, taken
+    from the run's AgentRunTracker. Must run on the Streamlit script thread
+    (AgentExecutor invokes agent and tool callbacks there).
+    """
+
+    def __init__(self, status, tracker: AgentRunTracker):
+        self.status = status
+        self.tracker = tracker
+        self.steps = 0
+
+    def update_label(self, activity: str, state: Optional[str] = None):
+        searches = self.tracker.searches
+        if self.tracker.max_searches:
+            searches = f"{searches}/{self.tracker.max_searches}"
+        label = f"🔍 {activity} · {self.tracker.elapsed_seconds():.0f}s elapsed · {searches} searches"
+        try:
+            if state:
+                self.status.update(label=label, state=state)
+            else:
+                self.status.update(label=label)
+        except Exception as e:
+            print(f"Error updating agent status: {e}")
+
+    def write(self, text: str):
+        try:
+            self.status.markdown(text)
+        except Exception as e:
+            print(f"Error writing agent status: {e}")
+
+    # ------------------------------------------------------------------
+    # LangChain callbacks
+    # ------------------------------------------------------------------
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self.update_label("Thinking")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self.update_label("Thinking")
+
+    def on_agent_action(self, action: AgentAction, *, run_id: UUID, **kwargs: Any) -> None:
+        self.steps += 1
+        thought = _thought_from_action(action)
+        if thought:
+            self.write(f"**Step {self.steps} · Thought:** {_shorten(thought, 300)}")
+        self.write(f"**Action:** `{action.tool}` ← {_shorten(action.tool_input, 200)}")
+        self.update_label(f"Searching (step {self.steps})")
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        text = str(getattr(output, "content", output))
+        searches = len(re.findall(r"^### Search \d+:", text, flags=re.MULTILINE))
+        prefix = f"{searches} results · " if searches > 1 else ""
+        self.write(f"**Observation:** {prefix}{_shorten(text, OBSERVATION_PREVIEW_CHARS)}")
+        self.update_label(f"Reviewing results (step {self.steps})")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self.write(f"**Observation:** ⚠️ {_shorten(error, 200)}")
+
+    def on_agent_finish(self, finish: AgentFinish, *, run_id: UUID, **kwargs: Any) -> None:
+        self.write("**Final answer ready.**")
+
+    # ------------------------------------------------------------------
+    # Run-level updates from run_research_agent
+    # ------------------------------------------------------------------
+    def on_budget_stop(self, reason: str):
+        self.write(f"**Budget reached ({reason}).** Writing the final answer from the research so far…")
+        self.update_label("Writing final answer")
+
+    def on_run_complete(self, success: bool):
+        if success:
+            self.update_label("Research complete", state="complete")
+        else:
+            self.update_label("Research failed", state="error")
@@ -0,0 +1,182 @@
+"""
+Research Agent Run Tracking
+Callback handler that measures one agent run (LLM tokens, searches, wall time)
+and enforces its time, token and search budget
+"""
+
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from AI.token_utils import count_tokens
+
+
+# Budget stop reasons
+BUDGET_TIME = "time"
+BUDGET_TOKENS = "tokens"
+BUDGET_SEARCHES = "searches"
+
+
+class AgentRunTracker(BaseCallbackHandler):
+    """
+    Tracks usage of a single research agent run and checks it against a budget
+
+    Pass the tracker as a callback to the agent executor so every LLM call is
+    counted; search tools call try_reserve_search() before each query.
+    A limit of 0 (or None) means unlimited.
+    """
+
+    def __init__(self, max_seconds: float = 0, max_tokens: int = 0, max_searches: int = 0):
+        self.max_seconds = max_seconds or 0
+        self.max_tokens = max_tokens or 0
+        self.max_searches = max_searches or 0
+
+        self.started_at = time.monotonic()
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.llm_calls = 0
+        self.searches = 0
+        self.searches_denied = 0
+        self.stop_reason = None
+
+        self.llm_call_log = []  # per-iteration LLM tokens and latency
+        self.search_log = []  # per-search latency
+
+        self._lock = threading.Lock()
+        self._prompt_estimates = {}  # run_id -> estimated input tokens
+        self._llm_started_at = {}  # run_id -> monotonic start time
+
+    # ------------------------------------------------------------------
+    # LangChain callbacks
+    # ------------------------------------------------------------------
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        text = "\n".join(str(m.content) for batch in messages for m in batch)
+        self._prompt_estimates[run_id] = count_tokens(text)
+        self._llm_started_at[run_id] = time.monotonic()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._prompt_estimates[run_id] = count_tokens("\n".join(prompts))
+        self._llm_started_at[run_id] = time.monotonic()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        input_tokens, output_tokens = _extract_usage(response)
+
+        # Fallback: estimate tokens if the provider did not report usage
+        if input_tokens == 0 and output_tokens == 0:
+            input_tokens = self._prompt_estimates.get(run_id, 0)
+            output_tokens = count_tokens(
+                "".join(g.text for generations in response.generations for g in generations)
+            )
+        self._prompt_estimates.pop(run_id, None)
+        started_at = self._llm_started_at.pop(run_id, None)
+        latency = time.monotonic() - started_at if started_at is not None else 0.0
+
+        with self._lock:
+            self.llm_calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.llm_call_log.append({
+                "call": self.llm_calls,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "latency_seconds": round(latency, 2),
+            })
+
+    def record_search(self, query: str, latency: float, source: str = "api"):
+        """Record one search and how long it took (source: 'api', 'reused', 'denied')"""
+        with self._lock:
+            self.search_log.append({
+                "query": query,
+                "latency_seconds": round(latency, 3),
+                "source": source,
+            })
+
+    def restore_usage(self, usage: Dict[str, Any]):
+        """Carry searches and tokens of an interrupted run (see AI.agent_checkpoint) into this one"""
+        with self._lock:
+            self.searches += usage.get("searches", 0)
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.output_tokens += usage.get("output_tokens", 0)
+            self.llm_calls += usage.get("llm_calls", 0)
+
+    # ------------------------------------------------------------------
+    # Budget
+    # ------------------------------------------------------------------
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def try_reserve_search(self) -> bool:
+        """Count a search against the budget; False if the search budget is used up"""
+        with self._lock:
+            if self.max_searches and self.searches >= self.max_searches:
+                self.searches_denied += 1
+                return False
+            self.searches += 1
+            return True
+
+    def exhausted_reason(self) -> Optional[str]:
+        """Which budget (if any) has been used up"""
+        if self.max_seconds and self.elapsed_seconds() >= self.max_seconds:
+            return BUDGET_TIME
+        if self.max_tokens and self.total_tokens >= self.max_tokens:
+            return BUDGET_TOKENS
+        if self.max_searches and self.searches >= self.max_searches:
+            return BUDGET_SEARCHES
+        return None
+
+    def usage(self) -> Dict[str, Any]:
+        """Budget limits and usage so far"""
+        return {
+            "elapsed_seconds": round(self.elapsed_seconds(), 2),
+            "max_seconds": self.max_seconds,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.total_tokens,
+            "max_tokens": self.max_tokens,
+            "searches": self.searches,
+            "searches_denied": self.searches_denied,
+            "max_searches": self.max_searches,
+            "llm_calls": self.llm_calls,
+            "stop_reason": self.stop_reason,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        """Detailed execution metrics: per-iteration LLM tokens and per-search latency"""
+        api_latencies = [s["latency_seconds"] for s in self.search_log if s["source"] == "api"]
+        return {
+            "wall_time_seconds": round(self.elapsed_seconds(), 2),
+            "llm_calls": list(self.llm_call_log),
+            "searches": list(self.search_log),
+            "avg_search_latency_seconds": round(sum(api_latencies) / len(api_latencies), 3) if api_latencies else 0.0,
+        }
+
+
+def _extract_usage(response: LLMResult) -> tuple:
+    """Get (input_tokens, output_tokens) reported by the provider, or (0, 0)"""
+    input_tokens = 0
+    output_tokens = 0
+
+    # LangChain standardized usage metadata on chat messages
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None) if message is not None else None
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+
+    # Provider-specific token_usage in llm_output
+    if input_tokens == 0 and output_tokens == 0 and response.llm_output:
+        token_usage = response.llm_output.get("token_usage") or response.llm_output.get("usage") or {}
+        input_tokens = token_usage.get("prompt_tokens", 0) or token_usage.get("input_tokens", 0)
+        output_tokens = token_usage.get("completion_tokens", 0) or token_usage.get("output_tokens", 0)
+
+    return input_tokens, output_tokens
@@ -0,0 +1,242 @@
+"""
+Local Research Artifact Index
+Persistent SQLite full-text index (FTS5, LIKE fallback) over chunks of the
+research outputs this app has produced, in this and earlier sessions, so the
+research agent can search our own research before calling the web
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from AI.citation_registry import BIBLIOGRAPHY_HEADING, CITATION_ID_PATTERN, CitationRegistry
+from AI.context_retriever import chunk_text, tokenize
+from keys.config import ARTIFACT_INDEX_PATH, ARTIFACT_SEARCH_RESULTS
+
+
+BIBLIOGRAPHY_ENTRY_PATTERN = re.compile(r"^\[(C\d+)\]\s+(\S+)\s*$", flags=re.MULTILINE)
+
+NO_LOCAL_RESULTS = "No earlier research matches \"{query}\". Use web search for this."
+
+
+def split_bibliography(content: str) -> tuple:
+    """
+    Separate a research output from its bibliography
+
+    Returns:
+        (body, {citation_id: url}) - citation ids are per session, so they are
+        stored with their URLs and re-registered when a chunk is returned
+    """
+    body, heading, bibliography = content.partition(BIBLIOGRAPHY_HEADING)
+    if not heading:
+        return content, {}
+    return body.rstrip(), dict(BIBLIOGRAPHY_ENTRY_PATTERN.findall(bibliography))
+
+
+class ArtifactIndex:
+    """Full-text index of research output chunks, shared by all sessions of the process"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.searches = 0
+        self.hits = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # One connection shared by all Streamlit session threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                artifact_id TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                step_name TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                citations TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS artifact_chunks USING fts5(topic, chunk, artifact_id UNINDEXED)"
+            )
+            self.full_text = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: plain table searched with LIKE
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifact_chunks_plain (topic TEXT, chunk TEXT, artifact_id TEXT)"
+            )
+            self.full_text = False
+        self._conn.commit()
+
+    @staticmethod
+    def make_id(step_name: str, content: str) -> str:
+        return hashlib.sha256(f"{step_name}\n{content}".encode("utf-8")).hexdigest()[:24]
+
+    def add(self, step_name: str, topic: str, content: str, session_id: str = "unknown") -> int:
+        """
+        Index a research output (once per distinct output)
+
+        Returns:
+            Number of chunks added (0 if the output was already indexed)
+        """
+        if not content or not content.strip():
+            return 0
+
+        artifact_id = self.make_id(step_name, content)
+        body, citations = split_bibliography(content)
+        chunks = chunk_text(body)
+        table = "artifact_chunks" if self.full_text else "artifact_chunks_plain"
+
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM artifacts WHERE artifact_id = ?", (artifact_id,)
+            ).fetchone()
+            if exists:
+                return 0
+
+            self._conn.execute(
+                "INSERT INTO artifacts (artifact_id, session_id, step_name, topic, citations, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (artifact_id, session_id, step_name, topic, json.dumps(citations), time.time())
+            )
+            self._conn.executemany(
+                f"INSERT INTO {table} (topic, chunk, artifact_id) VALUES (?, ?, ?)",
+                [(topic, chunk, artifact_id) for chunk in chunks]
+            )
+            self._conn.commit()
+
+        return len(chunks)
+
+    def search(self, query: str, limit: int = ARTIFACT_SEARCH_RESULTS) -> List[Dict[str, Any]]:
+        """
+        Best matching chunks for a query
+
+        Returns:
+            [{'chunk', 'topic', 'step_name', 'session_id', 'created_at', 'citations'}], best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            self.searches += 1
+        if not terms:
+            return []
+
+        with self._lock:
+            if self.full_text:
+                # Any term may match; bm25() ranks chunks (lower is better), topic matches weigh double
+                rows = self._conn.execute(
+                    """
+                    SELECT artifact_chunks.chunk, a.topic, a.step_name, a.session_id, a.created_at, a.citations
+                    FROM artifact_chunks JOIN artifacts a ON a.artifact_id = artifact_chunks.artifact_id
+                    WHERE artifact_chunks MATCH ?
+                    ORDER BY bm25(artifact_chunks, 2.0, 1.0)
+                    LIMIT ?
+                    """,
+                    (" OR ".join(f'"{term}"' for term in terms), limit)
+                ).fetchall()
+            else:
+                clause = " OR ".join(["lower(c.chunk) LIKE ?"] * len(terms))
+                candidates = self._conn.execute(
+                    f"""
+                    SELECT c.chunk, a.topic, a.step_name, a.session_id, a.created_at, a.citations
+                    FROM artifact_chunks_plain c JOIN artifacts a ON a.artifact_id = c.artifact_id
+                    WHERE {clause}
+                    """,
+                    [f"%{term}%" for term in terms]
+                ).fetchall()
+                rows = sorted(
+                    candidates,
+                    key=lambda row: -sum(f"{row[1]} {row[0]}".lower().count(term) for term in terms)
+                )[:limit]
+
+            if rows:
+                self.hits += 1
+
+        return [
+            {
+                "chunk": chunk,
+                "topic": topic,
+                "step_name": step_name,
+                "session_id": session_id,
+                "created_at": created_at,
+                "citations": json.loads(citations)
+            }
+            for chunk, topic, step_name, session_id, created_at, citations in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            artifacts = self._conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+        return {
+            "artifacts": artifacts,
+            "full_text": self.full_text,
+            "searches": self.searches,
+            "hits": self.hits,
+        }
+
+
+def format_artifact_results(
+    query: str,
+    results: List[Dict[str, Any]],
+    session_id: Optional[str] = None,
+    citation_registry: Optional[CitationRegistry] = None
+) -> str:
+    """
+    Observation text for local search results
+
+    Citation ids in stored chunks belong to the session that wrote them; they
+    are re-registered in this session's registry (or dropped without one).
+    """
+    if not results:
+        return NO_LOCAL_RESULTS.format(query=query)
+
+    sections = []
+    for result in results:
+        citations = result["citations"]
+
+        def relink(match):
+            url = citations.get(match.group(1))
+            if url is None or citation_registry is None:
+                return ""
+            return f"[{citation_registry.register(url)[0]}]"
+
+        chunk = CITATION_ID_PATTERN.sub(relink, result["chunk"]).strip()
+        when = "this session" if session_id and result["session_id"] == session_id else \
+               datetime.fromtimestamp(result["created_at"]).strftime("%Y-%m-%d")
+        sections.append(f"### Earlier {result['step_name']} research on \"{result['topic']}\" ({when})\n{chunk}")
+
+    return f"Earlier research matching \"{query}\":\n\n" + "\n\n".join(sections)
+
+
+_artifact_index = None
+_artifact_index_lock = threading.Lock()
+
+
+def get_artifact_index() -> ArtifactIndex:
+    """Get the process-wide artifact index (shared across sessions)"""
+    global _artifact_index
+    if _artifact_index is None:
+        with _artifact_index_lock:
+            if _artifact_index is None:
+                _artifact_index = ArtifactIndex(ARTIFACT_INDEX_PATH)
+    return _artifact_index
+
+
+def index_research_output(step_name: str, topic: str, content: str, session_id: str = "unknown") -> int:
+    """Add a research output to the local index; returns chunks added (0 on error)"""
+    try:
+        return get_artifact_index().add(step_name, topic, content, session_id)
+    except Exception as e:
+        print(f"Error indexing research output: {e}")
+        return 0
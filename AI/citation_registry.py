@@ -0,0 +1,174 @@
+"""
+Citation Registry
+Session-wide store of search citations with stable short ids ([C1], [C2], ...)
+so repeated URLs are referenced by id instead of being repeated in every
+observation, and each document ends with one bibliography
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional
+
+import streamlit as st
+
+
+CITATION_ID_PATTERN = re.compile(r"\[(C\d+)\]")
+
+# Perplexity marks inline references with the 1-based index of the citations list
+INLINE_REFERENCE_PATTERN = re.compile(r"\[(\d+)\]")
+
+BIBLIOGRAPHY_HEADING = "## References"
+
+
+class CitationRegistry:
+    """Maps citation URLs to stable ids for the whole session"""
+
+    def __init__(self):
+        self.ids = {}  # url -> id
+        self.urls = {}  # id -> url
+        self._next_number = 1
+        self._lock = threading.Lock()
+
+    def _assign(self, url: str) -> str:
+        citation_id = f"C{self._next_number}"
+        self._next_number += 1
+        self.ids[url] = citation_id
+        self.urls[citation_id] = url
+        return citation_id
+
+    def register(self, url: str) -> tuple:
+        """
+        Get the id for a URL, assigning the next one if it is new
+
+        Returns:
+            (citation_id, is_new)
+        """
+        url = url.strip()
+        with self._lock:
+            citation_id = self.ids.get(url)
+            if citation_id is not None:
+                return citation_id, False
+            return self._assign(url), True
+
+    def restore(self, urls: Dict[str, str]) -> Dict[str, str]:
+        """
+        Re-register citations saved from another registry (e.g. an agent checkpoint)
+
+        Saved ids are kept where this registry has not used them; otherwise
+        the URL gets its id in this registry.
+
+        Args:
+            urls: Saved citation id -> URL
+
+        Returns:
+            {saved id: id in this registry} for the ids that changed
+        """
+        remap = {}
+        with self._lock:
+            for saved_id, url in sorted(urls.items(), key=lambda item: int(item[0][1:])):
+                url = url.strip()
+                citation_id = self.ids.get(url)
+                if citation_id is None and saved_id not in self.urls:
+                    self.ids[url] = saved_id
+                    self.urls[saved_id] = url
+                    self._next_number = max(self._next_number, int(saved_id[1:]) + 1)
+                    continue
+                if citation_id is None:
+                    citation_id = self._assign(url)
+                if citation_id != saved_id:
+                    remap[saved_id] = citation_id
+        return remap
+
+    def format_observation(self, content: str, citations: List[str], limit: int = 5) -> str:
+        """
+        Format a search answer using citation ids
+
+        Inline [n] references become [Cx] ids. URLs seen for the first time
+        are listed with their id; URLs already cited in this session are
+        listed by id only.
+
+        Args:
+            content: Answer text from the search model
+            citations: Source URLs returned with the answer
+            limit: Maximum number of sources listed
+
+        Returns:
+            Observation text
+        """
+        citation_ids = [self.register(url) for url in citations]
+        result = self._replace_references(content, citation_ids)
+        if not citations:
+            return result
+
+        new_sources = []
+        known_sources = []
+        for url, (citation_id, is_new) in zip(citations[:limit], citation_ids[:limit]):
+            if is_new:
+                new_sources.append(f"[{citation_id}] {url.strip()}")
+            else:
+                known_sources.append(f"[{citation_id}]")
+
+        result += "\n\n**Sources:**\n"
+        if new_sources:
+            result += "\n".join(new_sources) + "\n"
+        if known_sources:
+            result += f"Previously cited: {', '.join(known_sources)}\n"
+
+        return result
+
+    def link_references(self, content: str, citations: List[str]) -> str:
+        """Rewrite inline [n] references to session citation ids ([Cx])"""
+        return self._replace_references(content, [self.register(url) for url in citations])
+
+    @staticmethod
+    def _replace_references(content: str, citation_ids: List[tuple]) -> str:
+        def replace_reference(match):
+            index = int(match.group(1)) - 1
+            if 0 <= index < len(citation_ids):
+                return f"[{citation_ids[index][0]}]"
+            return match.group(0)
+
+        return INLINE_REFERENCE_PATTERN.sub(replace_reference, content)
+
+    def bibliography(self, text: str) -> str:
+        """Bibliography of the citation ids referenced in text, in id order"""
+        cited = {citation_id for citation_id in CITATION_ID_PATTERN.findall(text) if citation_id in self.urls}
+        if not cited:
+            return ""
+
+        lines = [
+            f"[{citation_id}] {self.urls[citation_id]}"
+            for citation_id in sorted(cited, key=lambda c: int(c[1:]))
+        ]
+        return f"{BIBLIOGRAPHY_HEADING}\n\n" + "\n".join(lines)
+
+    def append_bibliography(self, document: str) -> str:
+        """Add the bibliography to the end of a document (once)"""
+        if not document or BIBLIOGRAPHY_HEADING in document:
+            return document
+
+        bibliography = self.bibliography(document)
+        if not bibliography:
+            return document
+        return f"{document.rstrip()}\n\n{bibliography}\n"
+
+    def stats(self) -> Dict[str, int]:
+        return {"citations": len(self.ids)}
+
+
+def remap_citation_ids(text: str, remap: Dict[str, str]) -> str:
+    """Rewrite [Cx] ids in text with a {old id: new id} map (all at once, so ids can swap)"""
+    if not remap or not text:
+        return text
+    return CITATION_ID_PATTERN.sub(lambda match: f"[{remap.get(match.group(1), match.group(1))}]", text)
+
+
+def get_citation_registry() -> Optional[CitationRegistry]:
+    """Get or create the citation registry in session state"""
+    try:
+        if 'citation_registry' not in st.session_state:
+            st.session_state.citation_registry = CitationRegistry()
+        return st.session_state.citation_registry
+    except Exception as e:
+        print(f"Citation registry unavailable: {e}")
+        return None
@@ -0,0 +1,293 @@
+"""
+Session Artifact Context Retriever
+In-process BM25 index over chunks of session artifacts so a step can send only
+the parts of earlier outputs that are relevant to its module prompt
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import streamlit as st
+
+from AI.token_utils import count_tokens
+from keys.config import CONTEXT_RETRIEVAL_TOP_K, CONTEXT_CHUNK_CHARS
+
+
+# Context keys backed by earlier session artifacts: context key -> (session_data section, field)
+RETRIEVABLE_CONTEXT_KEYS = {
+    'topic_research': ('topic_research_data', 'research_output'),
+    'client_transcript': ('client_conversation_data', 'transcript_output'),
+    'client_information': ('client_conversation_data', 'info_output'),
+    'model_deliverable_research': ('model_deliverable_data', 'research_output'),
+    'model_deliverable': ('model_deliverable_data', 'deliverable_output'),
+}
+
+CHUNK_SEPARATOR = "\n\n[...]\n\n"
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was",
+    "were", "will", "with", "you", "your", "their", "they", "we", "our", "should",
+    "can", "each", "all", "any", "into", "not", "but", "if", "then", "than", "so",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def chunk_text(text: str, max_chars: int = CONTEXT_CHUNK_CHARS) -> List[str]:
+    """
+    Split text into paragraph-aligned chunks of at most max_chars
+
+    Paragraphs are packed together until the limit; a single oversized paragraph
+    is split on sentence boundaries (and hard-cut as a last resort).
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+    pieces = []
+    for paragraph in paragraphs:
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        sentence_buffer = ""
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while len(sentence) > max_chars:
+                pieces.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            if sentence_buffer and len(sentence_buffer) + len(sentence) + 1 > max_chars:
+                pieces.append(sentence_buffer)
+                sentence_buffer = sentence
+            else:
+                sentence_buffer = f"{sentence_buffer} {sentence}".strip()
+        if sentence_buffer:
+            pieces.append(sentence_buffer)
+
+    chunks = []
+    buffer = ""
+    for piece in pieces:
+        if buffer and len(buffer) + len(piece) + 2 > max_chars:
+            chunks.append(buffer)
+            buffer = piece
+        else:
+            buffer = f"{buffer}\n\n{piece}" if buffer else piece
+    if buffer:
+        chunks.append(buffer)
+
+    return chunks
+
+
+class BM25Index:
+    """Incremental BM25 index over chunks of named artifacts"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, chunk_chars: int = CONTEXT_CHUNK_CHARS):
+        self.k1 = k1
+        self.b = b
+        self.chunk_chars = chunk_chars
+        self.chunks = {}  # chunk_id -> {'artifact', 'position', 'text', 'tf', 'length'}
+        self.artifact_chunks = {}  # artifact_id -> [chunk_id, ...]
+        self.artifact_hashes = {}  # artifact_id -> content hash
+        self.doc_freq = Counter()
+        self.total_length = 0
+
+    def add_artifact(self, artifact_id: str, text: str) -> bool:
+        """
+        Index (or re-index) an artifact
+
+        Returns:
+            True if the index changed, False if the artifact was already indexed as-is
+        """
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self.artifact_hashes.get(artifact_id) == content_hash:
+            return False
+
+        self.remove_artifact(artifact_id)
+
+        chunk_ids = []
+        for position, chunk in enumerate(chunk_text(text, self.chunk_chars)):
+            terms = tokenize(chunk)
+            tf = Counter(terms)
+            chunk_id = f"{artifact_id}#{position}"
+            self.chunks[chunk_id] = {
+                'artifact': artifact_id,
+                'position': position,
+                'text': chunk,
+                'tf': tf,
+                'length': len(terms),
+            }
+            self.doc_freq.update(tf.keys())
+            self.total_length += len(terms)
+            chunk_ids.append(chunk_id)
+
+        self.artifact_chunks[artifact_id] = chunk_ids
+        self.artifact_hashes[artifact_id] = content_hash
+        return True
+
+    def remove_artifact(self, artifact_id: str):
+        """Drop all chunks belonging to an artifact"""
+        for chunk_id in self.artifact_chunks.pop(artifact_id, []):
+            chunk = self.chunks.pop(chunk_id)
+            self.doc_freq.subtract(chunk['tf'].keys())
+            self.total_length -= chunk['length']
+        self.doc_freq += Counter()  # drop zero counts
+        self.artifact_hashes.pop(artifact_id, None)
+
+    def chunk_count(self, artifact_id: Optional[str] = None) -> int:
+        """Number of chunks in the index (optionally for one artifact)"""
+        if artifact_id is None:
+            return len(self.chunks)
+        return len(self.artifact_chunks.get(artifact_id, []))
+
+    def search(self, query: str, top_k: int = CONTEXT_RETRIEVAL_TOP_K, artifact_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Rank chunks against a query with BM25
+
+        Args:
+            query: Free-text query (e.g. the module prompt)
+            top_k: Number of chunks to return
+            artifact_id: Restrict results to a single artifact
+
+        Returns:
+            List of {'artifact', 'position', 'text', 'score'} sorted by score
+        """
+        if not self.chunks:
+            return []
+
+        query_terms = set(tokenize(query))
+        n_chunks = len(self.chunks)
+        avg_length = self.total_length / n_chunks if n_chunks else 0
+
+        candidate_ids = self.artifact_chunks.get(artifact_id, []) if artifact_id else list(self.chunks)
+
+        scored = []
+        for chunk_id in candidate_ids:
+            chunk = self.chunks[chunk_id]
+            length_norm = 1 - self.b + self.b * (chunk['length'] / avg_length if avg_length else 0)
+            score = 0.0
+            for term in query_terms:
+                tf = chunk['tf'].get(term)
+                if not tf:
+                    continue
+                df = self.doc_freq[term]
+                idf = math.log(1 + (n_chunks - df + 0.5) / (df + 0.5))
+                score += idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+            scored.append((score, chunk))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {'artifact': chunk['artifact'], 'position': chunk['position'], 'text': chunk['text'], 'score': score}
+            for score, chunk in scored[:top_k]
+        ]
+
+
+def get_context_index() -> BM25Index:
+    """Get or create the session's artifact index"""
+    if 'context_index' not in st.session_state:
+        st.session_state.context_index = BM25Index()
+    return st.session_state.context_index
+
+
+def update_context_index(session_data: Dict[str, Any]) -> int:
+    """
+    Incrementally index every artifact output in session_data
+
+    Only artifacts whose content changed since the last call are re-chunked.
+
+    Returns:
+        Number of artifacts (re-)indexed
+    """
+    index = get_context_index()
+    updated = 0
+    for section, section_data in session_data.items():
+        if not isinstance(section_data, dict):
+            continue
+        for field, value in section_data.items():
+            if field.endswith('_output') and isinstance(value, str) and value.strip():
+                if index.add_artifact(f"{section}.{field}", value):
+                    updated += 1
+    return updated
+
+
+def select_context(
+    context: Dict[str, Any],
+    query: str,
+    step_name: str = "unknown",
+    top_k: int = CONTEXT_RETRIEVAL_TOP_K
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Replace full artifact documents in a context dict with their top-k relevant chunks
+
+    Context keys that are not backed by a session artifact (e.g. earlier PRD
+    sections) are passed through unchanged, as are artifacts too short to trim.
+
+    Args:
+        context: Context dict passed to the AI generation step
+        query: Retrieval query (module prompt plus topic)
+        step_name: Workflow step name (for the savings log)
+        top_k: Chunks to keep per artifact
+
+    Returns:
+        (selected_context, stats) where stats reports full vs selected context tokens
+    """
+    index = get_context_index()
+    selected = {}
+    per_key = {}
+
+    for key, value in context.items():
+        if key not in RETRIEVABLE_CONTEXT_KEYS or not isinstance(value, str) or not value.strip():
+            selected[key] = value
+            continue
+
+        section, field = RETRIEVABLE_CONTEXT_KEYS[key]
+        artifact_id = f"{section}.{field}"
+        index.add_artifact(artifact_id, value)  # no-op if already indexed
+
+        if index.chunk_count(artifact_id) <= top_k:
+            selected[key] = value
+            continue
+
+        hits = index.search(query, top_k=top_k, artifact_id=artifact_id)
+        hits.sort(key=lambda hit: hit['position'])  # keep document order
+        selected[key] = CHUNK_SEPARATOR.join(hit['text'] for hit in hits)
+        per_key[key] = {
+            'chunks_total': index.chunk_count(artifact_id),
+            'chunks_selected': len(hits),
+        }
+
+    full_tokens = sum(count_tokens(str(v)) for v in context.values())
+    selected_tokens = sum(count_tokens(str(v)) for v in selected.values())
+
+    stats = {
+        'timestamp': datetime.now().isoformat(),
+        'step_name': step_name,
+        'full_context_tokens': full_tokens,
+        'selected_context_tokens': selected_tokens,
+        'tokens_saved': full_tokens - selected_tokens,
+        'artifacts': per_key,
+    }
+
+    if 'context_selection_log' not in st.session_state:
+        st.session_state.context_selection_log = []
+    st.session_state.context_selection_log.append(stats)
+
+    return selected, stats
+
+
+def get_context_savings_summary() -> Dict[str, Any]:
+    """Summarize tokens saved by context selection this session"""
+    log = st.session_state.get('context_selection_log', [])
+    full_tokens = sum(entry['full_context_tokens'] for entry in log)
+    saved_tokens = sum(entry['tokens_saved'] for entry in log)
+    return {
+        'steps': len(log),
+        'full_context_tokens': full_tokens,
+        'tokens_saved': saved_tokens,
+        'percent_saved': (saved_tokens / full_tokens * 100) if full_tokens else 0.0,
+    }
@@ -17,6 +17,7 @@ class TokenTracker:
     
     def __init__(self):
         self.usage_log = []
+        self.agent_runs = []
         self.session_totals = {
             'input_tokens': 0,
             'output_tokens': 0,
@@ -50,6 +51,29 @@ class TokenTracker:
         self.session_totals['total_cost_usd'] += cost_usd
         self.session_totals['total_content_length'] += content_length
     
+    def log_agent_run(self, step_name, model_name, metadata):
+        """Log execution metrics for a research agent run (tokens are logged via log_usage)"""
+        budget = metadata.get('budget', {})
+        metrics = metadata.get('metrics', {})
+        
+        self.agent_runs.append({
+            'timestamp': datetime.now().isoformat(),
+            'step_name': step_name,
+            'model_name': model_name,
+            'method': metadata.get('method', 'agent'),
+            'iterations': metadata.get('iterations', 0),
+            'tool_calls': metadata.get('tool_calls', 0),
+            'searches': budget.get('searches', 0),
+            'suppressed_searches': metadata.get('suppressed_searches', 0),
+            'input_tokens': budget.get('input_tokens', 0),
+            'output_tokens': budget.get('output_tokens', 0),
+            'wall_time_seconds': metrics.get('wall_time_seconds', 0.0),
+            'avg_search_latency_seconds': metrics.get('avg_search_latency_seconds', 0.0),
+            'stop_reason': budget.get('stop_reason'),
+            'llm_calls': metrics.get('llm_calls', []),
+            'search_calls': metrics.get('searches', [])
+        })
+    
     def calculate_cost(self, input_tokens, output_tokens, model_name="gpt-5"):
         """Calculate cost based on token usage and model pricing"""
         # OpenAI pricing per 1M tokens (updated 2025-09-08)
@@ -95,7 +119,11 @@ class TokenTracker:
             **self.session_totals,
             'steps_completed': len(self.usage_log),
             'avg_tokens_per_step': self.session_totals['total_tokens'] / len(self.usage_log) if self.usage_log else 0,
-            'avg_cost_per_step': self.session_totals['total_cost_usd'] / len(self.usage_log) if self.usage_log else 0
+            'avg_cost_per_step': self.session_totals['total_cost_usd'] / len(self.usage_log) if self.usage_log else 0,
+            'agent_runs': len(self.agent_runs),
+            'agent_tool_calls': sum(run['tool_calls'] for run in self.agent_runs),
+            'agent_searches': sum(run['searches'] for run in self.agent_runs),
+            'agent_wall_time_seconds': sum(run['wall_time_seconds'] for run in self.agent_runs)
         }
 
 def get_token_tracker():
@@ -114,6 +142,68 @@ def reset_token_tracking():
     if 'token_tracker' in st.session_state:
         st.session_state.token_tracker = TokenTracker()
     
+def get_module_for_step(step_name):
+    """Determine the workflow module from a step name (for Detailed_Logs)"""
+    step = step_name.lower()
+    if "topic" in step:
+        return "topic_research"
+    elif "client" in step:
+        return "client_conversation"
+    elif "model" in step:
+        return "model_deliverable"
+    elif "prd" in step:
+        return "prd"
+    return "unknown"
+
+def log_ai_usage(step_name, model_name, input_tokens, output_tokens, content, ai_model_label=None):
+    """
+    Record AI token usage in the TokenTracker and Google Sheets Detailed_Logs
+    Shared by direct generation and research agent runs
+    """
+    tracker = get_token_tracker()
+    tracker.log_usage(
+        step_name=step_name,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        content_length=len(content) if content else 0,
+        model_name=model_name
+    )
+    
+    # Log detailed data to Google Sheets
+    try:
+        from utils.google_sheets_logger import log_detailed_data
+        
+        # Get session info
+        session_id = st.session_state.get('session_id', 'unknown')
+        doc_id = st.session_state.get('current_doc_id', '')
+        
+        if ai_model_label is None:
+            ai_model_label = f"{get_model_info(model_name)['provider']}/{model_name}"
+        
+        log_detailed_data(
+            session_id=session_id,
+            doc_id=doc_id,
+            module=get_module_for_step(step_name),
+            step=step_name,
+            content=content,
+            ai_model=ai_model_label,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            tokens_used=input_tokens + output_tokens,
+            cost_usd=tracker.calculate_cost(input_tokens, output_tokens, model_name),
+            content_length=len(content) if content else 0
+        )
+        
+        # Also update session logs with current step progress
+        try:
+            from main import log_session_status_update
+            log_session_status_update()
+        except Exception as e:
+            print(f"Error updating session status: {e}")
+            
+    except Exception as e:
+        print(f"Error logging detailed data: {e}")
+    
 def generate_ai_response(prompt, context, step_name="unknown") -> str:
     """
     Generate AI response using LangChain with LangSmith tracking
@@ -166,68 +256,12 @@ def generate_ai_response(prompt, context, step_name="unknown") -> str:
         
         # Fallback: estimate tokens if not provided (mainly for Gemini)
         if input_tokens == 0 and output_tokens == 0:
-            import tiktoken
-            try:
-                encoding = tiktoken.get_encoding("cl100k_base")
-                input_tokens = len(encoding.encode(prompt + context_str))
-                output_tokens = len(encoding.encode(ai_response))
-            except:
-                # Very rough estimate: ~4 chars per token
-                input_tokens = (len(prompt) + len(context_str)) // 4
-                output_tokens = len(ai_response) // 4
+            from AI.token_utils import count_tokens
+            input_tokens = count_tokens(prompt + context_str)
+            output_tokens = count_tokens(ai_response)
         
-        # Track token usage in existing TokenTracker (for Google Sheets)
-        tracker = get_token_tracker()
-        tracker.log_usage(
-            step_name=step_name,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            content_length=len(ai_response) if ai_response else 0,
-            model_name=model_name
-        )
-        
-        # Log detailed data to Google Sheets
-        try:
-            from utils.google_sheets_logger import log_detailed_data
-            
-            # Get session info
-            session_id = st.session_state.get('session_id', 'unknown')
-            doc_id = st.session_state.get('current_doc_id', '')
-            
-            # Determine module from step_name
-            module = "unknown"
-            if "topic" in step_name.lower():
-                module = "topic_research"
-            elif "client" in step_name.lower():
-                module = "client_conversation"
-            elif "model" in step_name.lower():
-                module = "model_deliverable"
-            elif "prd" in step_name.lower():
-                module = "prd"
-            
-            log_detailed_data(
-                session_id=session_id,
-                doc_id=doc_id,
-                module=module,
-                step=step_name,
-                content=ai_response,
-                ai_model=f"{model_info['provider']}/{model_name}",
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                tokens_used=input_tokens + output_tokens,
-                cost_usd=tracker.calculate_cost(input_tokens, output_tokens, model_name),
-                content_length=len(ai_response) if ai_response else 0
-            )
-            
-            # Also update session logs with current step progress
-            try:
-                from main import log_session_status_update
-                log_session_status_update()
-            except Exception as e:
-                print(f"Error updating session status: {e}")
-                
-        except Exception as e:
-            print(f"Error logging detailed data: {e}")
+        # Track token usage in existing TokenTracker and Google Sheets
+        log_ai_usage(step_name, model_name, input_tokens, output_tokens, ai_response)
         
         return ai_response
         
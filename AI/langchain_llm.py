@@ -48,6 +48,10 @@ MODEL_MAPPING = {
 }
 
 
+# Providers whose LangChain chat models support native tool calling (bind_tools)
+TOOL_CALLING_PROVIDERS = {"openai", "anthropic", "google_genai"}
+
+
 def setup_langsmith():
     """Set up LangSmith environment variables for tracing"""
     if LANGSMITH_API_KEY:
@@ -162,6 +166,11 @@ def get_model_info(model_name: str) -> Dict[str, Any]:
     }
 
 
+def supports_tool_calling(model_name: str) -> bool:
+    """Whether the model can be driven with native tool calls (bind_tools)"""
+    return get_model_info(model_name)["provider"] in TOOL_CALLING_PROVIDERS
+
+
 def get_available_models() -> list:
     """Get list of all available model names for UI dropdown"""
     return list(MODEL_MAPPING.keys())
@@ -0,0 +1,178 @@
+"""
+Research Observation Compressor
+Extractive compression of search observations before they enter the agent
+scratchpad: only the sentences most relevant to the search query and research
+question are kept (with their citation ids), while the full text is kept out of
+band. Compression is lossy: the agent writes its Final Answer from the kept
+sentences, unless OBSERVATION_FULL_TEXT_SYNTHESIS rewrites it from the full
+observations (see AI.research_agent.run_research_agent). Budget-forced
+syntheses and checkpoints always use the full text.
+"""
+
+import re
+import threading
+from typing import Dict, Any, List, Tuple
+
+from AI.citation_registry import CITATION_ID_PATTERN
+from AI.context_retriever import BM25Index
+from AI.token_utils import count_tokens
+from keys.config import OBSERVATION_MAX_SENTENCES, OBSERVATION_COMPRESS_MIN_TOKENS
+
+
+SEARCH_SECTION_PATTERN = re.compile(r"^### Search \d+: (.*)$", re.MULTILINE)
+SECTION_SEPARATOR = "\n\n---\n\n"
+SOURCES_HEADING = "**Sources:**"
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[*])")
+_REFERENCES_ONLY = re.compile(r"^(?:\[\w+\]\s*)+$")
+_NUMBER_PATTERN = re.compile(r"\d")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split answer text into sentences (list items and headings count as one sentence)"""
+    sentences = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        for sentence in _SENTENCE_SPLIT.split(line):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            # Trailing citation markers ("... growth. [C2]") belong to the sentence before them
+            if sentences and _REFERENCES_ONLY.match(sentence):
+                sentences[-1] = f"{sentences[-1]} {sentence}"
+            else:
+                sentences.append(sentence)
+    return sentences
+
+
+def _split_sources(text: str) -> Tuple[str, str]:
+    """(answer body, sources block) of a formatted search result"""
+    if SOURCES_HEADING not in text:
+        return text, ""
+    body, sources = text.split(SOURCES_HEADING, 1)
+    return body.strip(), sources.strip()
+
+
+class ObservationCompressor:
+    """
+    Compresses the observations of one agent run
+
+    Sentences are ranked with BM25 against the search query plus the research
+    question; sentences containing figures get a small boost. The top
+    sentences are kept in their original order with their citation ids.
+    """
+
+    def __init__(
+        self,
+        question: str,
+        max_sentences: int = OBSERVATION_MAX_SENTENCES,
+        min_tokens: int = OBSERVATION_COMPRESS_MIN_TOKENS
+    ):
+        self.question = question
+        self.max_sentences = max_sentences
+        self.min_tokens = min_tokens
+
+        self.full_text = {}  # compressed observation -> full observation
+        self.raw_tokens = 0
+        self.compressed_tokens = 0
+        self.observations = 0
+        self._lock = threading.Lock()
+
+    def compress_result(self, query: str, result: str) -> str:
+        """Compress one search result (answer + sources)"""
+        body, sources = _split_sources(result)
+        sentences = split_sentences(body)
+        if len(sentences) <= self.max_sentences:
+            return result
+
+        # One tiny BM25 "artifact" per sentence so idf reflects this result
+        index = BM25Index(chunk_chars=max(len(s) for s in sentences) + 1)
+        for position, sentence in enumerate(sentences):
+            index.add_artifact(str(position), sentence)
+
+        scores = {
+            int(hit['artifact']): hit['score']
+            for hit in index.search(f"{query} {self.question}", top_k=len(sentences))
+        }
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: scores.get(i, 0.0) * (1.2 if _NUMBER_PATTERN.search(sentences[i]) else 1.0),
+            reverse=True
+        )
+        keep = sorted(ranked[:self.max_sentences])
+        kept_text = "\n".join(sentences[i] for i in keep)
+
+        compressed = kept_text
+        if sources:
+            # With registry ids the scratchpad only needs the ids that kept sentences cite
+            cited_ids = list(dict.fromkeys(CITATION_ID_PATTERN.findall(kept_text)))
+            if CITATION_ID_PATTERN.search(sources):
+                if cited_ids:
+                    compressed += f"\n{SOURCES_HEADING} " + ", ".join(f"[{c}]" for c in cited_ids)
+            else:
+                compressed += f"\n\n{SOURCES_HEADING}\n{sources}"
+
+        dropped = len(sentences) - len(keep)
+        return f"{compressed}\n(compressed: {dropped} less relevant sentences omitted)"
+
+    def compress(self, tool_input: Any, observation: str) -> str:
+        """
+        Compress a tool observation (single or multi-search output)
+
+        Error messages, budget notices and short observations pass through unchanged.
+        """
+        if not observation or observation.startswith(("Error", "Search budget")):
+            return observation
+
+        # Keep the "reused result" notice from query memory intact
+        notice = ""
+        if observation.startswith("[Reused result"):
+            notice, _, observation = observation.partition("\n")
+            notice += "\n"
+
+        raw_tokens = count_tokens(observation)
+        if raw_tokens < self.min_tokens:
+            compressed = observation
+        elif SEARCH_SECTION_PATTERN.search(observation):
+            sections = []
+            for section in observation.split(SECTION_SEPARATOR):
+                heading, _, result = section.partition("\n")
+                match = SEARCH_SECTION_PATTERN.match(heading)
+                query = match.group(1) if match else str(tool_input)
+                sections.append(f"{heading}\n{self.compress_result(query, result)}")
+            compressed = SECTION_SEPARATOR.join(sections)
+        else:
+            compressed = self.compress_result(str(tool_input), observation)
+
+        if notice:
+            compressed = notice + compressed
+            observation = notice + observation
+            raw_tokens = count_tokens(observation)
+
+        with self._lock:
+            self.observations += 1
+            self.raw_tokens += raw_tokens
+            self.compressed_tokens += count_tokens(compressed) if compressed != observation else raw_tokens
+            if compressed != observation:
+                self.full_text[compressed] = observation
+        return compressed
+
+    def has_compressed(self) -> bool:
+        """True if any observation in the scratchpad is shorter than its full text"""
+        return bool(self.full_text)
+
+    def expand(self, observation: str) -> str:
+        """Full text of a (possibly compressed) observation"""
+        return self.full_text.get(observation, observation)
+
+    def stats(self) -> Dict[str, Any]:
+        saved = self.raw_tokens - self.compressed_tokens
+        return {
+            "observations": self.observations,
+            "raw_tokens": self.raw_tokens,
+            "compressed_tokens": self.compressed_tokens,
+            "tokens_saved": saved,
+            "percent_saved": round(saved / self.raw_tokens * 100, 1) if self.raw_tokens else 0.0,
+        }
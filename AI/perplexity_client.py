@@ -0,0 +1,138 @@
+"""
+Perplexity HTTP Client
+Pooled keep-alive transport shared by every Perplexity call in the process
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Any, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from keys.config import (
+    PERPLEXITY_API_BASE,
+    PERPLEXITY_API_KEY,
+    PERPLEXITY_POOL_SIZE,
+    PERPLEXITY_CONNECT_TIMEOUT,
+    PERPLEXITY_READ_TIMEOUT
+)
+
+
+PERPLEXITY_API_URL = PERPLEXITY_API_BASE.rstrip("/")
+
+# One connection pool for the whole process. urllib3's pool manager is
+# thread-safe, so keep-alive connections (and their TLS sessions) are reused
+# across Streamlit session threads.
+_adapter = None
+_adapter_lock = threading.Lock()
+
+# requests.Session keeps mutable per-session state (cookies, hooks), so each
+# thread gets its own lightweight Session mounted on the shared adapter.
+_thread_local = threading.local()
+
+# httpx.AsyncClient is bound to the event loop it was first used on, so async
+# callers get one pooled client per running loop.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _get_adapter() -> HTTPAdapter:
+    """Get the process-wide pooled HTTP adapter"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=PERPLEXITY_POOL_SIZE,
+                    pool_block=False
+                )
+    return _adapter
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get this thread's HTTP session, backed by the shared keep-alive pool
+
+    Returns:
+        requests.Session safe to use from the calling thread
+    """
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", _get_adapter())
+        session.mount("http://", _get_adapter())
+        _thread_local.session = session
+    return session
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the pooled async HTTP client for the running event loop
+
+    Returns:
+        httpx.AsyncClient with keep-alive pooling and split connect/read timeouts
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=PERPLEXITY_POOL_SIZE,
+                max_keepalive_connections=PERPLEXITY_POOL_SIZE
+            ),
+            timeout=httpx.Timeout(PERPLEXITY_READ_TIMEOUT, connect=PERPLEXITY_CONNECT_TIMEOUT)
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _auth_headers() -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+
+def post_chat_completion(payload: Dict[str, Any], read_timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    POST a chat completions request to Perplexity
+
+    Args:
+        payload: Request body
+        read_timeout: Override PERPLEXITY_READ_TIMEOUT (long generations)
+
+    Returns:
+        Parsed JSON response
+
+    Raises:
+        requests.exceptions.RequestException on transport or HTTP errors
+    """
+    response = get_http_session().post(
+        f"{PERPLEXITY_API_URL}/chat/completions",
+        json=payload,
+        headers=_auth_headers(),
+        timeout=(PERPLEXITY_CONNECT_TIMEOUT, read_timeout or PERPLEXITY_READ_TIMEOUT)
+    )
+    response.raise_for_status()
+
+    return response.json()
+
+
+async def apost_chat_completion(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async version of post_chat_completion
+
+    Raises:
+        httpx.HTTPError on transport or HTTP errors
+    """
+    response = await get_async_http_client().post(
+        f"{PERPLEXITY_API_URL}/chat/completions",
+        json=payload,
+        headers=_auth_headers()
+    )
+    response.raise_for_status()
+
+    return response.json()
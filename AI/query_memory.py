@@ -0,0 +1,143 @@
+"""
+Research Query Memory
+Per-run memory of issued search queries so near-duplicate paraphrases reuse
+an earlier observation instead of calling the search API again, including
+paraphrases sent together in one multi-search batch
+"""
+
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from AI.context_retriever import tokenize
+from keys.config import RESEARCH_DUPLICATE_THRESHOLD
+
+
+REUSED_OBSERVATION_TAG = "[Reused result of an earlier search: \"{query}\" - no new search was run]"
+
+
+def _stem(token: str) -> str:
+    """Very light suffix stripping so plurals and -ing forms compare equal"""
+    for suffix in ("ing", "es", "s"):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def query_terms(query: str) -> Set[str]:
+    """Normalized token set for a query"""
+    return {_stem(t) for t in tokenize(query)}
+
+
+def query_shingles(terms: Set[str], size: int = 4) -> Set[str]:
+    """Character shingles over the sorted token set (catches spelling/word-form variants)"""
+    text = " ".join(sorted(terms))
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _score(terms: Set[str], shingles: Set[str], other_terms: Set[str], other_shingles: Set[str]) -> float:
+    return max(_jaccard(terms, other_terms), _jaccard(shingles, other_shingles))
+
+
+class QueryMemory:
+    """Remembers the queries of one agent run and detects near-duplicates"""
+
+    def __init__(self, threshold: float = RESEARCH_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.entries = []  # (query, terms, shingles, observation)
+        self.suppressed = 0
+        self._lock = threading.Lock()
+
+    def similarity(self, query_a: str, query_b: str) -> float:
+        """Similarity of two queries: max of token-set and shingle Jaccard"""
+        terms_a, terms_b = query_terms(query_a), query_terms(query_b)
+        return max(_jaccard(terms_a, terms_b), _jaccard(query_shingles(terms_a), query_shingles(terms_b)))
+
+    def find(self, query: str) -> Optional[Tuple[str, str]]:
+        """
+        Find an earlier query that is a near-duplicate of this one
+
+        Returns:
+            (earlier_query, observation) or None
+        """
+        terms = query_terms(query)
+        shingles = query_shingles(terms)
+
+        best = None
+        best_score = 0.0
+        with self._lock:
+            for earlier_query, earlier_terms, earlier_shingles, observation in self.entries:
+                score = _score(terms, shingles, earlier_terms, earlier_shingles)
+                if score > best_score:
+                    best, best_score = (earlier_query, observation), score
+
+        if best is not None and best_score >= self.threshold:
+            return best
+        return None
+
+    def batch_duplicates(self, queries: List[str]) -> Dict[str, str]:
+        """
+        Find near-duplicates within a batch of queries that run at the same time
+
+        Queries of one batch are not remembered until their searches finish, so
+        find() cannot catch paraphrases sent together. The first query of each
+        group of near-duplicates is searched; the others are counted as
+        suppressed and reuse its observation (see tag_reused).
+
+        Returns:
+            {duplicate query: batch query it duplicates}
+        """
+        kept = []  # (query, terms, shingles)
+        duplicates = {}
+        for query in queries:
+            terms = query_terms(query)
+            shingles = query_shingles(terms)
+            match = next(
+                (kept_query for kept_query, kept_terms, kept_shingles in kept
+                 if _score(terms, shingles, kept_terms, kept_shingles) >= self.threshold),
+                None
+            )
+            if match is None:
+                kept.append((query, terms, shingles))
+            else:
+                duplicates[query] = match
+
+        if duplicates:
+            with self._lock:
+                self.suppressed += len(duplicates)
+        return duplicates
+
+    @staticmethod
+    def tag_reused(earlier_query: str, observation: str) -> str:
+        """An earlier query's observation, tagged as reused"""
+        return f"{REUSED_OBSERVATION_TAG.format(query=earlier_query)}\n{observation}"
+
+    def remember(self, query: str, observation: str):
+        """Store a query and its observation (errors are not remembered)"""
+        if not observation or observation.startswith("Error"):
+            return
+        terms = query_terms(query)
+        with self._lock:
+            self.entries.append((query, terms, query_shingles(terms), observation))
+
+    def reuse(self, query: str) -> Optional[str]:
+        """
+        Return the earlier observation, tagged as reused, if this query is a near-duplicate
+
+        Counts the suppressed search.
+        """
+        match = self.find(query)
+        if match is None:
+            return None
+
+        earlier_query, observation = match
+        with self._lock:
+            self.suppressed += 1
+        return self.tag_reused(earlier_query, observation)
@@ -3,25 +3,180 @@ Research Agent Framework
 Uses LangChain agents with Perplexity search tool for enhanced research capabilities
 """
 
+import asyncio
+import json
 import os
-from typing import Dict, Any, Optional
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Union
+import httpx
+import requests
 import streamlit as st
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain.prompts import PromptTemplate
-from langchain.tools import Tool
+from langchain.agents import AgentExecutor, create_react_agent, create_tool_calling_agent
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
+from langchain.tools import StructuredTool, Tool
 from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, Field
 
-from AI.langchain_llm import get_chat_model
-from keys.config import PERPLEXITY_API_KEY
+from AI.agent_checkpoint import AgentCheckpoint, prune_checkpoints, restore_citations, restore_steps, resume_input
+from AI.agent_status import StreamlitAgentStatusHandler
+from AI.agent_tracking import AgentRunTracker
+from AI.artifact_index import format_artifact_results, get_artifact_index
+from AI.citation_registry import CitationRegistry, get_citation_registry, remap_citation_ids
+from AI.langchain_llm import get_chat_model, get_model_info, supports_tool_calling
+from AI.observation_compressor import ObservationCompressor
+from AI.perplexity_client import post_chat_completion, apost_chat_completion
+from AI.query_memory import QueryMemory
+from AI.search_cache import get_search_cache
+from keys.config import (
+    AGENT_CHECKPOINT_ENABLED,
+    ARTIFACT_SEARCH_ENABLED,
+    OBSERVATION_COMPRESSION_ENABLED,
+    OBSERVATION_FULL_TEXT_SYNTHESIS,
+    PERPLEXITY_API_KEY,
+    PERPLEXITY_CACHE_ENABLED,
+    PERPLEXITY_MAX_CONCURRENCY,
+    RESEARCH_AGENT_MODE,
+    RESEARCH_MAX_QUERIES_PER_STEP,
+    RESEARCH_MAX_SECONDS,
+    RESEARCH_MAX_TOKENS,
+    RESEARCH_MAX_SEARCHES
+)
+
+
+# Search model used by the agent's search tool
+PERPLEXITY_SEARCH_MODEL = "llama-3.1-sonar-small-128k-online"  # Fast, cost-effective search model
+
+# Agent modes
+AGENT_MODE_REACT = "react"  # One search per ReAct step
+AGENT_MODE_PARALLEL = "parallel"  # Several concurrent searches per ReAct step
+AGENT_MODE_TOOL_CALLING = "tool_calling"  # Native tool calls (bind_tools), several per turn
+AGENT_MODE_AUTO = "auto"  # Tool calling when the model supports it, else parallel ReAct
+
+
+def format_search_result(
+    content: str,
+    citations: List[str],
+    citation_registry: Optional[CitationRegistry] = None
+) -> str:
+    """
+    Format a Perplexity answer and its citations as an agent observation
+    
+    Args:
+        content: Answer text from the search model
+        citations: Source URLs returned with the answer
+        citation_registry: Session citation registry; when given, sources are
+                           referenced by stable ids and repeated URLs are not relisted
+        
+    Returns:
+        Observation text with the top 5 sources appended
+    """
+    if citation_registry is not None:
+        return citation_registry.format_observation(content, citations)
+    
+    result = content
+    if citations:
+        result += "\n\n**Sources:**\n"
+        for i, citation in enumerate(citations[:5], 1):  # Limit to top 5 citations
+            result += f"{i}. {citation}\n"
+    
+    return result
+
+
+def _build_search_payload(query: str) -> Dict[str, Any]:
+    """Request body for a Perplexity search query"""
+    return {
+        "model": PERPLEXITY_SEARCH_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are a research assistant. Provide accurate, citation-backed information."
+            },
+            {
+                "role": "user",
+                "content": query
+            }
+        ],
+        "temperature": 0.2,
+        "max_tokens": 2000,
+        "return_citations": True,
+        "return_images": False
+    }
+
+
+def _parse_search_response(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract content and citations from a Perplexity response"""
+    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+    citations = data.get("citations", [])
+    
+    return {"content": content, "citations": citations}
+
+
+def _request_perplexity_search(query: str) -> Dict[str, Any]:
+    """
+    Call the Perplexity chat completions API for a search query
+    
+    Returns:
+        {'content': str, 'citations': list}
+        
+    Raises:
+        requests.exceptions.RequestException on transport or HTTP errors
+    """
+    # Pooled keep-alive session with split connect/read timeouts
+    data = post_chat_completion(_build_search_payload(query))
+    return _parse_search_response(data)
+
+
+async def _arequest_perplexity_search(query: str) -> Dict[str, Any]:
+    """
+    Async version of _request_perplexity_search
+    
+    Raises:
+        httpx.HTTPError on transport or HTTP errors
+    """
+    data = await apost_chat_completion(_build_search_payload(query))
+    return _parse_search_response(data)
+
+
+def _get_cached_search(query: str) -> tuple:
+    """
+    Look up a search in the local cache
+    
+    Returns:
+        (cache, cached_result) - cache is None when caching is disabled or unavailable
+    """
+    if not PERPLEXITY_CACHE_ENABLED:
+        return None, None
+    try:
+        cache = get_search_cache()
+        return cache, cache.get(query, PERPLEXITY_SEARCH_MODEL)
+    except Exception as e:
+        print(f"Search cache unavailable: {e}")
+        return None, None
+
+
+def _store_cached_search(cache, query: str, result: Dict[str, Any]):
+    """Store a successful search result in the local cache"""
+    if cache is None or not result["content"]:
+        return
+    try:
+        cache.set(query, PERPLEXITY_SEARCH_MODEL, result["content"], result["citations"])
+    except Exception as e:
+        print(f"Error writing search cache: {e}")
 
 
 # Tool definitions
-def perplexity_search(query: str) -> str:
+def perplexity_search(query: str, citation_registry: Optional[CitationRegistry] = None) -> str:
     """
     Search using Perplexity API for real-time, citation-backed information
     
+    Results are served from the local search cache when a fresh entry exists
+    for the same normalized query, so repeated searches cost nothing.
+    
     Args:
         query: Search query string
+        citation_registry: Session citation registry used to format sources
         
     Returns:
         Search results with citations
@@ -29,71 +184,425 @@ def perplexity_search(query: str) -> str:
     if not PERPLEXITY_API_KEY:
         return "Error: Perplexity API key not configured. Please add PERPLEXITY_API_KEY to secrets."
     
+    cache, cached = _get_cached_search(query)
+    if cached is not None:
+        return format_search_result(cached["content"], cached["citations"], citation_registry)
+    
     try:
-        import requests
-        
-        # Perplexity API endpoint
-        url = "https://api.perplexity.ai/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "llama-3.1-sonar-small-128k-online",  # Fast, cost-effective search model
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a research assistant. Provide accurate, citation-backed information."
-                },
-                {
-                    "role": "user",
-                    "content": query
-                }
-            ],
-            "temperature": 0.2,
-            "max_tokens": 2000,
-            "return_citations": True,
-            "return_images": False
-        }
-        
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Extract content and citations
-        content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-        citations = data.get("citations", [])
-        
-        # Format response with citations
-        result = content
-        if citations:
-            result += "\n\n**Sources:**\n"
-            for i, citation in enumerate(citations[:5], 1):  # Limit to top 5 citations
-                result += f"{i}. {citation}\n"
-        
-        return result
-        
+        result = _request_perplexity_search(query)
     except requests.exceptions.Timeout:
         return "Error: Perplexity API request timed out. Please try again."
     except requests.exceptions.RequestException as e:
         return f"Error calling Perplexity API: {str(e)}"
     except Exception as e:
         return f"Error: {str(e)}"
+    
+    # Only successful results are cached
+    _store_cached_search(cache, query, result)
+    
+    return format_search_result(result["content"], result["citations"], citation_registry)
+
+
+async def aperplexity_search(query: str, citation_registry: Optional[CitationRegistry] = None) -> str:
+    """
+    Async version of perplexity_search
+    
+    Same cache, result formatting and citation truncation, but the HTTP
+    request runs on the event loop instead of blocking a thread. The SQLite
+    cache lookup and store run on a worker thread so they do not hold up the
+    other queries on the loop.
+    
+    Only async callers (the tools' coroutine, e.g. agent.ainvoke) use this
+    path; run_research_agent drives the agent synchronously (agent.iter), so
+    the app searches through perplexity_search and the multi-search thread pool.
+    
+    Args:
+        query: Search query string
+        citation_registry: Session citation registry used to format sources
+        
+    Returns:
+        Search results with citations
+    """
+    if not PERPLEXITY_API_KEY:
+        return "Error: Perplexity API key not configured. Please add PERPLEXITY_API_KEY to secrets."
+    
+    cache, cached = await asyncio.to_thread(_get_cached_search, query)
+    if cached is not None:
+        return format_search_result(cached["content"], cached["citations"], citation_registry)
+    
+    try:
+        result = await _arequest_perplexity_search(query)
+    except httpx.TimeoutException:
+        return "Error: Perplexity API request timed out. Please try again."
+    except httpx.HTTPError as e:
+        return f"Error calling Perplexity API: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+    
+    # Only successful results are cached
+    await asyncio.to_thread(_store_cached_search, cache, query, result)
+    
+    return format_search_result(result["content"], result["citations"], citation_registry)
 
 
+PERPLEXITY_SEARCH_DESCRIPTION = (
+    "Search for current, factual information using Perplexity AI. "
+    "Use this to find recent data, statistics, best practices, case studies, "
+    "and real-world examples. Returns citation-backed results. "
+    "Input should be a clear, specific search query."
+)
+
 # Create the Perplexity search tool
 perplexity_tool = Tool(
     name="perplexity_search",
     func=perplexity_search,
-    description=(
-        "Search for current, factual information using Perplexity AI. "
-        "Use this to find recent data, statistics, best practices, case studies, "
-        "and real-world examples. Returns citation-backed results. "
-        "Input should be a clear, specific search query."
+    coroutine=aperplexity_search,
+    description=PERPLEXITY_SEARCH_DESCRIPTION
+)
+
+
+def parse_search_queries(queries: Union[str, List[str]], max_queries: int = RESEARCH_MAX_QUERIES_PER_STEP) -> List[str]:
+    """
+    Parse a multi-search tool input into individual queries
+    
+    Accepts a list of strings (native tool calls), a JSON list of strings, or
+    one query per line (bullets, numbering and surrounding quotes are
+    stripped). Other separators such as ";" are kept, since they can be part
+    of a query. Duplicates are dropped and the list is capped at max_queries.
+    """
+    parsed = None
+    text = ""
+    if isinstance(queries, list):
+        parsed = queries
+    else:
+        text = queries.strip()
+    if text.startswith("["):
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            parsed = None
+    
+    if isinstance(parsed, list):
+        candidates = [str(q) for q in parsed]
+    else:
+        candidates = text.split("\n")
+    
+    cleaned = []
+    for candidate in candidates:
+        query = re.sub(r"^\s*(?:[-*\u2022]|\d+[.)])\s*", "", candidate).strip().strip("\"'`").strip()
+        if query and query.lower() not in [q.lower() for q in cleaned]:
+            cleaned.append(query)
+    
+    return cleaned[:max_queries]
+
+
+def perplexity_multi_search(
+    queries: Union[str, List[str]],
+    search_func: Callable[[str], str] = perplexity_search,
+    query_memory: Optional[QueryMemory] = None
+) -> str:
+    """
+    Run several Perplexity searches concurrently
+    
+    Args:
+        queries: List, JSON list or newline-separated list of search queries
+        search_func: Single-query search to run for each query
+        query_memory: Run query memory; near-duplicates within the batch are
+                      searched once
+        
+    Returns:
+        Results for every query, in input order, each under its own heading
+    """
+    query_list = parse_search_queries(queries)
+    if not query_list:
+        return "Error: No search queries provided. Input should be a JSON list of search queries."
+    
+    duplicates = query_memory.batch_duplicates(query_list) if query_memory is not None else {}
+    unique_queries = [query for query in query_list if query not in duplicates]
+    max_workers = max(1, min(len(unique_queries), PERPLEXITY_MAX_CONCURRENCY))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(unique_queries, executor.map(search_func, unique_queries)))
+    
+    return _format_multi_search(query_list, _batch_results(query_list, results, duplicates))
+
+
+async def aperplexity_multi_search(
+    queries: Union[str, List[str]],
+    search_coro: Callable[[str], Awaitable[str]] = aperplexity_search,
+    query_memory: Optional[QueryMemory] = None
+) -> str:
+    """
+    Async version of perplexity_multi_search (concurrency bounded by PERPLEXITY_MAX_CONCURRENCY)
+    
+    Args:
+        queries: List, JSON list or newline-separated list of search queries
+        search_coro: Single-query async search to run for each query
+        query_memory: Run query memory; near-duplicates within the batch are
+                      searched once
+        
+    Returns:
+        Results for every query, in input order, each under its own heading
+    """
+    query_list = parse_search_queries(queries)
+    if not query_list:
+        return "Error: No search queries provided. Input should be a JSON list of search queries."
+    
+    duplicates = query_memory.batch_duplicates(query_list) if query_memory is not None else {}
+    unique_queries = [query for query in query_list if query not in duplicates]
+    semaphore = asyncio.Semaphore(max(1, PERPLEXITY_MAX_CONCURRENCY))
+    
+    async def bounded_search(query: str) -> str:
+        async with semaphore:
+            return await search_coro(query)
+    
+    results = await asyncio.gather(*(bounded_search(query) for query in unique_queries))
+    return _format_multi_search(query_list, _batch_results(query_list, dict(zip(unique_queries, results)), duplicates))
+
+
+def _batch_results(query_list: List[str], results: Dict[str, str], duplicates: Dict[str, str]) -> List[str]:
+    """Results in query order; batch duplicates get the result of the query they duplicate"""
+    return [
+        QueryMemory.tag_reused(duplicates[query], results[duplicates[query]]) if query in duplicates else results[query]
+        for query in query_list
+    ]
+
+
+def _format_multi_search(query_list: List[str], results: List[str]) -> str:
+    """Combine per-query results under numbered headings"""
+    sections = [
+        f"### Search {i}: {query}\n{result}"
+        for i, (query, result) in enumerate(zip(query_list, results), 1)
+    ]
+    return "\n\n---\n\n".join(sections)
+
+
+# Create the parallel multi-query search tool
+PERPLEXITY_MULTI_SEARCH_DESCRIPTION = (
+    "Run several searches at once using Perplexity AI. "
+    "Use this to gather data, statistics, best practices, case studies and examples "
+    "for different aspects of the research in a single step. Returns citation-backed "
+    "results for each query. Input should be a JSON list of clear, specific, distinct "
+    f"search queries (up to {RESEARCH_MAX_QUERIES_PER_STEP})."
+)
+
+perplexity_multi_tool = Tool(
+    name="perplexity_multi_search",
+    func=perplexity_multi_search,
+    coroutine=aperplexity_multi_search,
+    description=PERPLEXITY_MULTI_SEARCH_DESCRIPTION
+)
+
+
+class MultiSearchInput(BaseModel):
+    """Arguments of the natively tool-called multi-search"""
+    queries: List[str] = Field(
+        description=f"Clear, specific, distinct search queries (up to {RESEARCH_MAX_QUERIES_PER_STEP}); all run at the same time"
+    )
+
+
+SEARCH_BUDGET_EXHAUSTED = (
+    "Search budget exhausted: this search was not run. Do not search again. "
+    "Write the Final Answer now using the observations you already have."
+)
+
+
+def build_search_runners(
+    tracker: Optional[AgentRunTracker] = None,
+    query_memory: Optional[QueryMemory] = None,
+    citation_registry: Optional[CitationRegistry] = None
+) -> tuple:
+    """
+    Single-query search functions bound to one run's budget, query memory and citations
+    
+    Returns:
+        (run_search, arun_search) - sync and async functions of one query
+    """
+    def before_search(query: str) -> Optional[str]:
+        """Observation to return without searching (reused or over budget), else None"""
+        if query_memory is not None:
+            reused = query_memory.reuse(query)
+            if reused is not None:
+                if tracker is not None:
+                    tracker.record_search(query, 0.0, source="reused")
+                return reused
+        
+        if tracker is not None and not tracker.try_reserve_search():
+            tracker.record_search(query, 0.0, source="denied")
+            return SEARCH_BUDGET_EXHAUSTED
+        
+        return None
+    
+    def after_search(query: str, observation: str, started_at: float):
+        if tracker is not None:
+            tracker.record_search(query, time.monotonic() - started_at, source="api")
+        if query_memory is not None:
+            query_memory.remember(query, observation)
+    
+    def run_search(query: str) -> str:
+        skipped = before_search(query)
+        if skipped is not None:
+            return skipped
+        started_at = time.monotonic()
+        observation = perplexity_search(query, citation_registry)
+        after_search(query, observation, started_at)
+        return observation
+    
+    async def arun_search(query: str) -> str:
+        skipped = before_search(query)
+        if skipped is not None:
+            return skipped
+        started_at = time.monotonic()
+        observation = await aperplexity_search(query, citation_registry)
+        after_search(query, observation, started_at)
+        return observation
+    
+    return run_search, arun_search
+
+
+def build_research_tools(
+    mode: str,
+    tracker: Optional[AgentRunTracker] = None,
+    query_memory: Optional[QueryMemory] = None,
+    citation_registry: Optional[CitationRegistry] = None,
+    compressor: Optional[ObservationCompressor] = None
+) -> List[Tool]:
+    """
+    Build the search tools for one agent run
+    
+    Args:
+        mode: Agent mode (see create_research_agent)
+        tracker: Run tracker whose search budget each query is counted against
+        query_memory: Run query memory; near-duplicate queries reuse the earlier
+                      observation instead of calling the API
+        citation_registry: Session citation registry used to format sources
+        compressor: Run observation compressor; tool observations are compressed
+                    before they reach the scratchpad
+        
+    Returns:
+        List of tools for the agent
+    """
+    if (tracker is None and query_memory is None and citation_registry is None and compressor is None
+            and mode != AGENT_MODE_TOOL_CALLING):
+        return [perplexity_multi_tool] if mode == AGENT_MODE_PARALLEL else [perplexity_tool]
+    
+    run_search, arun_search = build_search_runners(tracker, query_memory, citation_registry)
+    
+    def run_multi_search(queries: Union[str, List[str]]) -> str:
+        return perplexity_multi_search(queries, search_func=run_search, query_memory=query_memory)
+    
+    async def arun_multi_search(queries: Union[str, List[str]]) -> str:
+        return await aperplexity_multi_search(queries, search_coro=arun_search, query_memory=query_memory)
+    
+    def compact(search_func: Callable[[Any], str]) -> Callable[[Any], str]:
+        """Compress what a tool returns (query memory and the cache keep full results)"""
+        if compressor is None:
+            return search_func
+        
+        # Named like the structured tool's argument, which is passed by keyword
+        def run(queries: Any) -> str:
+            return compressor.compress(queries, search_func(queries))
+        return run
+    
+    def acompact(search_coro: Callable[[Any], Awaitable[str]]) -> Callable[[Any], Awaitable[str]]:
+        if compressor is None:
+            return search_coro
+        
+        async def arun(queries: Any) -> str:
+            return compressor.compress(queries, await search_coro(queries))
+        return arun
+    
+    if mode == AGENT_MODE_TOOL_CALLING:
+        # Structured arguments: the provider validates the query list, so there is nothing to mis-parse
+        return [StructuredTool.from_function(
+            func=compact(run_multi_search),
+            coroutine=acompact(arun_multi_search),
+            name="perplexity_multi_search",
+            description=PERPLEXITY_MULTI_SEARCH_DESCRIPTION.rsplit(" Input should be", 1)[0],
+            args_schema=MultiSearchInput
+        )]
+    
+    if mode == AGENT_MODE_PARALLEL:
+        return [Tool(
+            name="perplexity_multi_search",
+            func=compact(run_multi_search),
+            coroutine=acompact(arun_multi_search),
+            description=PERPLEXITY_MULTI_SEARCH_DESCRIPTION
+        )]
+    
+    return [Tool(
+        name="perplexity_search",
+        func=compact(run_search),
+        coroutine=acompact(arun_search),
+        description=PERPLEXITY_SEARCH_DESCRIPTION
+    )]
+
+
+LOCAL_RESEARCH_TOOL_NAME = "local_research_search"
+
+LOCAL_RESEARCH_SEARCH_DESCRIPTION = (
+    "Search the research we have already produced (earlier topic and model research from this "
+    "and past sessions). Free and instant, so use it before web search. "
+    "Input should be a short keyword query."
+)
+
+
+class LocalSearchInput(BaseModel):
+    """Arguments of the natively tool-called local research search"""
+    query: str = Field(description="Short keyword query")
+
+
+def build_local_research_tool(
+    mode: str,
+    tracker: Optional[AgentRunTracker] = None,
+    citation_registry: Optional[CitationRegistry] = None,
+    session_id: Optional[str] = None
+) -> Tool:
+    """
+    Build the local research search tool (full-text index of earlier research outputs)
+    
+    Local searches do not count against the search budget.
+    
+    Args:
+        mode: Agent mode (see create_research_agent)
+        tracker: Run tracker that records local searches
+        citation_registry: Session citation registry; citation ids in earlier
+                           outputs are re-registered in this session
+        session_id: Current session id (labels results from this session)
+        
+    Returns:
+        Tool for the agent
+    """
+    def run_local_search(query: str) -> str:
+        started_at = time.monotonic()
+        try:
+            results = get_artifact_index().search(query)
+        except Exception as e:
+            print(f"Error searching local research: {e}")
+            return f"Error searching earlier research: {str(e)}. Use web search instead."
+        
+        if tracker is not None:
+            tracker.record_search(query, time.monotonic() - started_at, source="local")
+        return format_artifact_results(query, results, session_id, citation_registry)
+    
+    if mode == AGENT_MODE_TOOL_CALLING:
+        return StructuredTool.from_function(
+            func=run_local_search,
+            name=LOCAL_RESEARCH_TOOL_NAME,
+            description=LOCAL_RESEARCH_SEARCH_DESCRIPTION.rsplit(" Input should be", 1)[0],
+            args_schema=LocalSearchInput
+        )
+    
+    return Tool(
+        name=LOCAL_RESEARCH_TOOL_NAME,
+        func=run_local_search,
+        description=LOCAL_RESEARCH_SEARCH_DESCRIPTION
     )
+
+
+# First guideline of each agent prompt when the local research tool is available
+LOCAL_SEARCH_GUIDELINE = (
+    f"- Start with {LOCAL_RESEARCH_TOOL_NAME}: earlier research on similar topics is free and instant. "
+    "Use web search only for what it does not cover and for current data\n"
 )
 
 
@@ -120,8 +629,8 @@ Thought: I now have enough information to provide a comprehensive answer
 Final Answer: your detailed research output based on all observations
 
 IMPORTANT GUIDELINES:
-- Use the search tool multiple times with different queries to gather comprehensive information
-- Always cite sources when using search results
+{local_search_guideline}- Use the search tool multiple times with different queries to gather comprehensive information
+- Always cite sources by their ids (e.g. [C1]) when using search results; do not write a reference list, one is added automatically
 - Synthesize information from multiple searches into a coherent output
 - Focus on recent, relevant, and authoritative information
 - When instructed by the prompts, structure your output according to those instructions
@@ -133,35 +642,178 @@ Question: {input}
 {agent_scratchpad}"""
 
 
-def create_research_agent(model_name: str, temperature: float = 0.7) -> AgentExecutor:
+# ReAct prompt for the parallel mode: plan several queries per step
+RESEARCH_AGENT_PARALLEL_PROMPT = """You are a learning experience design research assistant with access to search tools.
+
+Your goal is to conduct thorough research based on the instructions and context provided.
+
+You have access to the following tools:
+
+{tools}
+
+Tool names: {tool_names}
+
+Use the following format:
+
+Question: the research task you must complete
+Thought: plan ALL the information you need right now and break it into several distinct search queries
+Action: the action to take, must be one of [{tool_names}]
+Action Input: the tool input - for perplexity_multi_search a JSON list of search queries, e.g. ["query one", "query two", "query three"]
+Observation: the results of every query
+... (repeat Thought/Action/Action Input/Observation only if important gaps remain)
+Thought: I now have enough information to provide a comprehensive answer
+Final Answer: your detailed research output based on all observations
+
+IMPORTANT GUIDELINES:
+{local_search_guideline}- Each search step runs all of its queries at the same time, so batch every query you need into one step
+- Cover different aspects of the research (data and statistics, best practices, case studies, tools) in the first step
+- Use a follow-up step only for gaps the first results did not cover; most research needs one or two search steps
+- Always cite sources by their ids (e.g. [C1]) when using search results; do not write a reference list, one is added automatically
+- Synthesize information from multiple searches into a coherent output
+- Focus on recent, relevant, and authoritative information
+- When instructed by the prompts, structure your output according to those instructions
+
+Begin!
+
+Question: {input}
+
+{agent_scratchpad}"""
+
+
+# Output AgentExecutor returns when it hits its own iteration or time limit
+AGENT_STOPPED_OUTPUT_PREFIX = "Agent stopped due to"
+
+# Native tool-calling agent system prompt (tool calls replace the Action/Action Input text format)
+RESEARCH_AGENT_TOOL_CALLING_PROMPT = """You are a learning experience design research assistant with access to a web search tool.
+
+Your goal is to conduct thorough research based on the instructions and context provided, then write the requested output.
+
+IMPORTANT GUIDELINES:
+{local_search_guideline}- Each perplexity_multi_search call runs all of its queries at the same time, so put every query you need into one call
+- Cover different aspects of the research (data and statistics, best practices, case studies, tools) in the first call
+- Search again only for gaps the first results did not cover; most research needs one or two rounds of searching
+- When you have enough information, reply with the final research output directly (no tool call)
+- Always cite sources by their ids (e.g. [C1]) when using search results; do not write a reference list, one is added automatically
+- Synthesize information from multiple searches into a coherent output
+- Focus on recent, relevant, and authoritative information
+- When instructed by the prompts, structure your output according to those instructions"""
+
+
+# Instructions for the forced Final Answer when the research budget runs out
+FINAL_ANSWER_SYNTHESIS_PROMPT = """You are a learning experience design research assistant.
+
+The research phase has ended. You must now write the final research output using ONLY the research gathered so far.
+
+IMPORTANT GUIDELINES:
+- Do not ask for or plan more searches
+- Always cite sources from the gathered research by their ids (e.g. [C1]); do not write a reference list, one is added automatically
+- Synthesize the findings into a coherent output
+- When instructed by the prompts, structure your output according to those instructions
+- Where the gathered research does not cover part of the instructions, say so briefly instead of inventing facts"""
+
+# Added to the synthesis input when the agent already wrote a Final Answer from compressed observations
+DRAFT_REVISION_INSTRUCTIONS = """**DRAFT ANSWER (written from condensed search results):**
+{draft}
+
+Rewrite the draft using the full research above: keep its structure and claims that the research supports, and restore the relevant facts, figures and citations the condensed results left out."""
+
+
+def resolve_agent_mode(mode: str, model_name: str) -> str:
+    """
+    Pick the concrete agent mode for a model
+    
+    AGENT_MODE_AUTO uses native tool calling when the model supports it and
+    parallel ReAct otherwise; an explicit tool-calling request falls back the
+    same way for models without tool support.
+    """
+    if mode in (AGENT_MODE_AUTO, AGENT_MODE_TOOL_CALLING):
+        if supports_tool_calling(model_name):
+            return AGENT_MODE_TOOL_CALLING
+        if mode == AGENT_MODE_TOOL_CALLING:
+            print(f"{model_name} does not support tool calling; using ReAct agent")
+        return AGENT_MODE_PARALLEL
+    return mode
+
+
+def _message_text(content: Any) -> str:
+    """Text of a model message or agent output (some providers return content blocks)"""
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return content
+
+
+def create_research_agent(
+    model_name: str,
+    temperature: float = 0.7,
+    mode: str = RESEARCH_AGENT_MODE,
+    tracker: Optional[AgentRunTracker] = None,
+    query_memory: Optional[QueryMemory] = None,
+    citation_registry: Optional[CitationRegistry] = None,
+    compressor: Optional[ObservationCompressor] = None
+) -> AgentExecutor:
     """
     Create a LangChain research agent with Perplexity search tool
     
     Args:
         model_name: Name of the LLM model to use
         temperature: Sampling temperature
+        mode: AGENT_MODE_REACT (one search per step),
+              AGENT_MODE_PARALLEL (several concurrent searches per step),
+              AGENT_MODE_TOOL_CALLING (native tool calls, for models that support them) or
+              AGENT_MODE_AUTO (tool calling when supported, else parallel ReAct)
+        tracker: Optional run tracker enforcing the search and time budget
+        query_memory: Optional per-run memory that suppresses near-duplicate searches
+        citation_registry: Optional session citation registry used to format sources
+        compressor: Optional observation compressor for the scratchpad
         
     Returns:
         AgentExecutor ready to perform research tasks
     """
+    mode = resolve_agent_mode(mode, model_name)
+    
     # Get the chat model
     llm = get_chat_model(model_name, temperature=temperature, max_tokens=15000)
     
-    # Define available tools
-    tools = [perplexity_tool]
+    # Define available tools for the selected mode
+    tools = build_research_tools(mode, tracker, query_memory, citation_registry, compressor)
     
-    # Create prompt template
-    prompt = PromptTemplate(
-        input_variables=["input", "agent_scratchpad", "tools", "tool_names"],
-        template=RESEARCH_AGENT_PROMPT
-    )
+    # Earlier research (local full-text index) is searched before the web
+    local_search_guideline = ""
+    if ARTIFACT_SEARCH_ENABLED:
+        try:
+            session_id = st.session_state.get('session_id')
+        except Exception:
+            session_id = None
+        tools.append(build_local_research_tool(mode, tracker, citation_registry, session_id))
+        local_search_guideline = LOCAL_SEARCH_GUIDELINE
     
-    # Create the ReAct agent
-    agent = create_react_agent(
-        llm=llm,
-        tools=tools,
-        prompt=prompt
-    )
+    if mode == AGENT_MODE_TOOL_CALLING:
+        # Native tool calling (bind_tools): the model may issue several calls per turn
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", RESEARCH_AGENT_TOOL_CALLING_PROMPT),
+            ("human", "{input}"),
+            MessagesPlaceholder("agent_scratchpad")
+        ]).partial(local_search_guideline=local_search_guideline)
+        agent = create_tool_calling_agent(llm=llm, tools=tools, prompt=prompt)
+    else:
+        template = RESEARCH_AGENT_PARALLEL_PROMPT if mode == AGENT_MODE_PARALLEL else RESEARCH_AGENT_PROMPT
+        
+        # Create prompt template
+        prompt = PromptTemplate(
+            input_variables=["input", "agent_scratchpad", "tools", "tool_names"],
+            template=template,
+            partial_variables={"local_search_guideline": local_search_guideline}
+        )
+        
+        # Create the ReAct agent
+        agent = create_react_agent(
+            llm=llm,
+            tools=tools,
+            prompt=prompt
+        )
     
     # Create agent executor
     agent_executor = AgentExecutor(
@@ -169,6 +821,7 @@ def create_research_agent(model_name: str, temperature: float = 0.7) -> AgentExe
         tools=tools,
         verbose=True,  # Show reasoning steps
         max_iterations=10,  # Allow multiple search queries
+        max_execution_time=tracker.max_seconds if tracker and tracker.max_seconds else None,
         handle_parsing_errors=True,
         return_intermediate_steps=True  # Track tool usage for LangSmith
     )
@@ -176,56 +829,235 @@ def create_research_agent(model_name: str, temperature: float = 0.7) -> AgentExe
     return agent_executor
 
 
+def synthesize_final_answer(
+    model_name: str,
+    agent_input: str,
+    intermediate_steps: List[Any],
+    tracker: Optional[AgentRunTracker] = None,
+    compressor: Optional[ObservationCompressor] = None,
+    draft: Optional[str] = None
+) -> str:
+    """
+    Write the Final Answer from the full observations gathered so far
+    
+    Used when the agent stops on its budget (or iteration limit) before
+    writing its own Final Answer, and to rewrite the agent's own Final
+    Answer (the draft) when it was written from compressed observations.
+    
+    Args:
+        model_name: Name of the LLM model to use
+        agent_input: The original agent input (instructions + context)
+        intermediate_steps: (action, observation) pairs from the agent run
+        tracker: Run tracker to count the synthesis call against
+        compressor: The run's observation compressor; synthesis uses the full
+                    observations it kept out of band
+        draft: The agent's Final Answer to revise, if it wrote one
+        
+    Returns:
+        Final research output
+    """
+    llm = get_chat_model(model_name, temperature=0.7, max_tokens=15000)
+    
+    observations = "\n\n".join(
+        f"### {getattr(action, 'tool', 'search')}: {getattr(action, 'tool_input', '')}\n"
+        f"{compressor.expand(observation) if compressor else observation}"
+        for action, observation in intermediate_steps
+    ) or "(no searches were completed)"
+    
+    messages = [
+        SystemMessage(content=FINAL_ANSWER_SYNTHESIS_PROMPT),
+        HumanMessage(content=f"""{agent_input}
+
+**RESEARCH GATHERED SO FAR:**
+{observations}
+{DRAFT_REVISION_INSTRUCTIONS.format(draft=draft) if draft else ""}""")
+    ]
+    
+    config = {"callbacks": [tracker]} if tracker else None
+    response = llm.invoke(messages, config=config)
+    return _message_text(response.content)
+
+
+def build_agent_input(combined_prompt: str, context: Dict[str, Any]) -> str:
+    """Combine prompts (instructions) with context (data to work with) into the research input"""
+    context_str = "\n\n".join([f"**{k}:** {v}" for k, v in context.items()])
+    
+    return f"""
+**INSTRUCTIONS:**
+{combined_prompt}
+
+**CONTEXT:**
+{context_str}
+
+Based on the instructions and context above, conduct thorough research and generate the requested output.
+Use the search tool to find current, relevant information to enhance your research.
+"""
+
+
 def run_research_agent(
     combined_prompt: str,
     context: Dict[str, Any],
     model_name: str,
-    step_name: str = "research"
+    step_name: str = "research",
+    mode: str = RESEARCH_AGENT_MODE,
+    status=None
 ) -> Optional[str]:
     """
     Run the research agent with prompts and context
     
+    The run is bounded by a time, token and search budget (RESEARCH_MAX_*).
+    When any budget is used up the agent stops and a Final Answer is
+    synthesized from the observations it already has. When search
+    observations were compressed for the scratchpad, the agent's own Final
+    Answer is based on the compressed text unless OBSERVATION_FULL_TEXT_SYNTHESIS
+    rewrites it from the full observations.
+    
+    Progress is checkpointed after every iteration (see AI.agent_checkpoint);
+    a run interrupted by a rerun or restart resumes from its last checkpoint.
+    
     Args:
         combined_prompt: System instructions (meta + module prompts)
         context: Dictionary with topic and other context data
         model_name: Name of the LLM model to use
         step_name: Name of the workflow step (for logging)
+        mode: Agent mode (see create_research_agent)
+        status: Optional st.status container; each Thought/Action/Observation
+                is summarized into it as the run progresses
         
     Returns:
         Generated research content or None on error
     """
+    status_handler = None
     try:
+        tracker = AgentRunTracker(
+            max_seconds=RESEARCH_MAX_SECONDS,
+            max_tokens=RESEARCH_MAX_TOKENS,
+            max_searches=RESEARCH_MAX_SEARCHES
+        )
+        
+        callbacks = [tracker]
+        if status is not None:
+            status_handler = StreamlitAgentStatusHandler(status, tracker)
+            callbacks.append(status_handler)
+        
+        query_memory = QueryMemory()
+        
+        # Looked up here: search tools may run on worker threads without session state
+        citation_registry = get_citation_registry()
+        
+        # Long observations are compressed for the scratchpad; full text is kept for synthesis
+        compressor = ObservationCompressor(question=str(context.get('topic', ''))) if OBSERVATION_COMPRESSION_ENABLED else None
+        
         # Create the agent
-        agent = create_research_agent(model_name)
+        agent = create_research_agent(
+            model_name,
+            mode=mode,
+            tracker=tracker,
+            query_memory=query_memory,
+            citation_registry=citation_registry,
+            compressor=compressor
+        )
         
-        # Format the input for the agent
-        # Combine prompts (instructions) with context (data to work with)
-        context_str = "\n\n".join([f"**{k}:** {v}" for k, v in context.items()])
+        agent_input = build_agent_input(combined_prompt, context)
         
-        agent_input = f"""
-**INSTRUCTIONS:**
-{combined_prompt}
-
-**CONTEXT:**
-{context_str}
-
-Based on the instructions and context above, conduct thorough research and generate the requested output.
-Use the search tool to find current, relevant information to enhance your research.
-"""
+        # Resume an interrupted run: earlier searches are reused and their
+        # observations (with the agent's reasoning) are handed to the agent
+        checkpoint = None
+        if AGENT_CHECKPOINT_ENABLED:
+            try:
+                session_id = st.session_state.get('session_id')
+            except Exception:
+                session_id = None
+            checkpoint = AgentCheckpoint(step_name, agent_input, session_id)
+            prune_checkpoints()
+        restored_steps = []
+        state = checkpoint.load() if checkpoint is not None else None
+        if state:
+            # Before any new source is registered, so saved ids keep their URLs
+            remap = restore_citations(state, citation_registry)
+            restored_steps = restore_steps(state, remap)
+            for query, observation in state.get("queries", []):
+                query_memory.remember(query, remap_citation_ids(observation, remap))
+            tracker.restore_usage(state.get("usage", {}))
+            print(f"Resuming research agent for {step_name} from checkpoint: {len(restored_steps)} earlier steps")
+            if status_handler is not None:
+                status_handler.write(f"**Resumed** from an interrupted run ({len(restored_steps)} earlier steps, "
+                                     f"{tracker.searches} searches already done)")
+        run_input = resume_input(agent_input, restored_steps, compressor)
+        
+        # Run the agent step by step so the budget is checked after every iteration
+        # (a resumed run may have used its budget before the interruption)
+        output = None
+        intermediate_steps = list(restored_steps)
+        tracker.stop_reason = tracker.exhausted_reason()
+        chunks = agent.iter({"input": run_input}, callbacks=callbacks) if not tracker.stop_reason else []
+        for chunk in chunks:
+            if "intermediate_step" in chunk:
+                intermediate_steps.extend(chunk["intermediate_step"])
+                if checkpoint is not None:
+                    try:
+                        checkpoint.save(intermediate_steps, query_memory, tracker, compressor, citation_registry)
+                    except Exception as e:
+                        print(f"Error saving agent checkpoint: {e}")
+                tracker.stop_reason = tracker.exhausted_reason()
+                if tracker.stop_reason:
+                    break
+            elif "output" in chunk:
+                output = _message_text(chunk["output"])
+                intermediate_steps = restored_steps + chunk.get("intermediate_steps", intermediate_steps[len(restored_steps):])
         
-        # Run the agent
-        result = agent.invoke({"input": agent_input})
+        # The executor's own iteration/time limit returns a placeholder instead of an answer
+        if output and output.startswith(AGENT_STOPPED_OUTPUT_PREFIX):
+            tracker.stop_reason = tracker.exhausted_reason() or "iterations"
+            output = None
         
-        # Extract the final answer
-        output = result.get("output", "")
+        if output is None:
+            print(f"Research agent stopped on {tracker.stop_reason} budget; synthesizing final answer")
+            if status_handler is not None:
+                status_handler.on_budget_stop(tracker.stop_reason)
+            output = synthesize_final_answer(model_name, agent_input, intermediate_steps, tracker, compressor)
+        elif compressor is not None and compressor.has_compressed() and OBSERVATION_FULL_TEXT_SYNTHESIS:
+            # The agent wrote its answer from compressed observations: final synthesis uses the full text
+            output = synthesize_final_answer(
+                model_name, agent_input, intermediate_steps, tracker, compressor, draft=output
+            ) or output
+        
+        # One bibliography per document for the citation ids it references
+        if citation_registry is not None and output:
+            output = citation_registry.append_bibliography(output)
+        
+        result = {
+            "output": output,
+            "intermediate_steps": intermediate_steps,
+            "budget": tracker.usage(),
+            "suppressed_searches": query_memory.suppressed,
+            "metrics": tracker.metrics()
+        }
+        if compressor is not None:
+            result["metrics"]["observation_compression"] = compressor.stats()
+        
+        if status_handler is not None:
+            status_handler.on_run_complete(bool(output))
         
         if not output:
             st.error("Agent did not produce any output")
             return None
         
+        if checkpoint is not None:
+            checkpoint.delete()
+        
+        # Record the run in the same token/cost accounting as direct generation
+        metadata = get_agent_metadata(result)
+        try:
+            log_agent_run(step_name, model_name, metadata, output)
+        except Exception as e:
+            print(f"Error logging agent run: {e}")
+        
         return output
         
     except Exception as e:
+        if status_handler is not None:
+            status_handler.on_run_complete(False)
         st.error(f"Error running research agent: {str(e)}")
         import traceback
         st.error(f"Traceback: {traceback.format_exc()}")
@@ -245,7 +1077,10 @@ def get_agent_metadata(result: Dict[str, Any]) -> Dict[str, Any]:
     metadata = {
         "tool_calls": 0,
         "tools_used": [],
-        "iterations": 0
+        "iterations": 0,
+        "budget": result.get("budget", {}),
+        "suppressed_searches": result.get("suppressed_searches", 0),
+        "metrics": result.get("metrics", {})
     }
     
     try:
@@ -266,3 +1101,37 @@ def get_agent_metadata(result: Dict[str, Any]) -> Dict[str, Any]:
     
     return metadata
 
+
+def log_agent_run(step_name: str, model_name: str, metadata: Dict[str, Any], output: str, method: str = "agent"):
+    """
+    Record an agent run in the TokenTracker and Google Sheets logs
+    
+    Args:
+        step_name: Name of the workflow step
+        model_name: Name of the LLM model used
+        metadata: Result of get_agent_metadata
+        output: Final research output
+        method: Research method label for the logs ('agent', 'pipeline' or 'sonar')
+    """
+    from AI.generate_ai_response import get_token_tracker, log_ai_usage
+    
+    budget = metadata.get("budget", {})
+    metrics = metadata.get("metrics", {})
+    
+    log_ai_usage(
+        step_name=step_name,
+        model_name=model_name,
+        input_tokens=budget.get("input_tokens", 0),
+        output_tokens=budget.get("output_tokens", 0),
+        content=output,
+        ai_model_label=f"{method}:{get_model_info(model_name)['provider']}/{model_name}"
+    )
+    
+    get_token_tracker().log_agent_run(step_name, model_name, metadata)
+    
+    print(
+        f"Research {method} run for {step_name}: {metadata.get('iterations', 0)} iterations, "
+        f"{metadata.get('tool_calls', 0)} tool calls, {budget.get('searches', 0)} searches, "
+        f"{budget.get('total_tokens', 0)} tokens, {metrics.get('wall_time_seconds', 0)}s"
+    )
+
@@ -0,0 +1,183 @@
+"""
+Plan-Search-Synthesize Research Pipeline
+Research without an agent loop: one planning call writes the search queries,
+all searches run concurrently, and one synthesis call writes the output -
+three sequential round trips instead of up to twenty
+"""
+
+import json
+import re
+from typing import Dict, Any, List, Optional
+
+import streamlit as st
+from langchain_core.agents import AgentAction
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from AI.agent_tracking import AgentRunTracker
+from AI.citation_registry import get_citation_registry
+from AI.langchain_llm import get_chat_model
+from AI.query_memory import QueryMemory
+from AI.research_agent import (
+    _message_text,
+    build_agent_input,
+    build_search_runners,
+    get_agent_metadata,
+    log_agent_run,
+    parse_search_queries,
+    perplexity_multi_search,
+    synthesize_final_answer
+)
+from keys.config import (
+    RESEARCH_MAX_SECONDS,
+    RESEARCH_MAX_TOKENS,
+    RESEARCH_MAX_SEARCHES,
+    RESEARCH_PIPELINE_QUERIES
+)
+
+
+RESEARCH_PLANNING_PROMPT = """You are a learning experience design research planner.
+
+Read the research instructions and context, then plan the web searches needed to complete them.
+
+Return ONLY a JSON list of {n} search queries, for example:
+["query one", "query two"]
+
+GUIDELINES:
+- Each query should be clear, specific and cover a different aspect (data and statistics, best practices, case studies, tools, trends)
+- Include the topic and audience in each query so it stands on its own
+- Do not number the queries or add any other text"""
+
+
+def plan_search_queries(
+    model_name: str,
+    research_input: str,
+    n_queries: int = RESEARCH_PIPELINE_QUERIES,
+    tracker: Optional[AgentRunTracker] = None
+) -> List[str]:
+    """
+    Planning call: ask the model for the search queries
+
+    Args:
+        model_name: Name of the LLM model to use
+        research_input: Instructions + context (see build_agent_input)
+        n_queries: Number of queries to request
+        tracker: Run tracker to count the call against
+
+    Returns:
+        Up to n_queries distinct search queries
+    """
+    llm = get_chat_model(model_name, temperature=0.3, max_tokens=1000)
+
+    messages = [
+        SystemMessage(content=RESEARCH_PLANNING_PROMPT.format(n=n_queries)),
+        HumanMessage(content=research_input)
+    ]
+
+    config = {"callbacks": [tracker]} if tracker else None
+    response = _message_text(llm.invoke(messages, config=config).content)
+
+    # Models sometimes wrap the list in prose or a code fence
+    match = re.search(r"\[.*\]", response, flags=re.DOTALL)
+    return parse_search_queries(match.group(0) if match else response, max_queries=n_queries)
+
+
+def run_research_pipeline(
+    combined_prompt: str,
+    context: Dict[str, Any],
+    model_name: str,
+    step_name: str = "research",
+    status=None
+) -> Optional[str]:
+    """
+    Run plan -> concurrent searches -> synthesis
+
+    Uses the same search budget, near-duplicate suppression, citation ids and
+    logging as the research agent.
+
+    Args:
+        combined_prompt: System instructions (meta + module prompts)
+        context: Dictionary with topic and other context data
+        model_name: Name of the LLM model to use
+        step_name: Name of the workflow step (for logging)
+        status: Optional st.status container for progress updates
+
+    Returns:
+        Generated research content or None on error
+    """
+    def show(label: str, detail: Optional[str] = None):
+        if status is None:
+            return
+        try:
+            status.update(label=f"🔍 {label} · {tracker.elapsed_seconds():.0f}s elapsed")
+            if detail:
+                status.markdown(detail)
+        except Exception as e:
+            print(f"Error updating pipeline status: {e}")
+
+    try:
+        tracker = AgentRunTracker(
+            max_seconds=RESEARCH_MAX_SECONDS,
+            max_tokens=RESEARCH_MAX_TOKENS,
+            max_searches=RESEARCH_MAX_SEARCHES
+        )
+        query_memory = QueryMemory()
+        citation_registry = get_citation_registry()
+        research_input = build_agent_input(combined_prompt, context)
+
+        # 1. Plan
+        show("Planning searches")
+        queries = plan_search_queries(model_name, research_input, tracker=tracker)
+        if not queries:
+            queries = [str(context.get('topic', step_name))]
+        show(f"Searching ({len(queries)} queries)", "**Plan:**\n" + "\n".join(f"- {q}" for q in queries))
+
+        # 2. Search (all queries at once)
+        run_search, _ = build_search_runners(tracker, query_memory, citation_registry)
+        observation = perplexity_multi_search(queries, search_func=run_search, query_memory=query_memory)
+        intermediate_steps = [(
+            AgentAction(tool="perplexity_multi_search", tool_input=json.dumps(queries), log=""),
+            observation
+        )]
+        show("Writing research output", f"**Searches complete:** {tracker.searches} run, {query_memory.suppressed} reused")
+
+        # 3. Synthesize
+        output = synthesize_final_answer(model_name, research_input, intermediate_steps, tracker)
+        if citation_registry is not None and output:
+            output = citation_registry.append_bibliography(output)
+
+        if not output:
+            if status is not None:
+                status.update(label="🔍 Research failed", state="error")
+            st.error("Research pipeline did not produce any output")
+            return None
+
+        result = {
+            "output": output,
+            "intermediate_steps": intermediate_steps,
+            "budget": tracker.usage(),
+            "suppressed_searches": query_memory.suppressed,
+            "metrics": tracker.metrics()
+        }
+        metadata = get_agent_metadata(result)
+        metadata["method"] = "pipeline"
+        try:
+            log_agent_run(step_name, model_name, metadata, output, method="pipeline")
+        except Exception as e:
+            print(f"Error logging research pipeline run: {e}")
+
+        if status is not None:
+            try:
+                status.update(label=f"🔍 Research complete · {tracker.elapsed_seconds():.0f}s · {tracker.searches} searches", state="complete")
+            except Exception as e:
+                print(f"Error updating pipeline status: {e}")
+
+        return output
+
+    except Exception as e:
+        if status is not None:
+            try:
+                status.update(label="🔍 Research failed", state="error")
+            except Exception:
+                pass
+        st.error(f"Error running research pipeline: {str(e)}")
+        return None
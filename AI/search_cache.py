@@ -0,0 +1,173 @@
+"""
+Perplexity Search Result Cache
+Persistent SQLite cache for search results keyed by normalized query and search model
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from keys.config import (
+    PERPLEXITY_CACHE_PATH,
+    PERPLEXITY_CACHE_TTL_SECONDS,
+    PERPLEXITY_CACHE_MAX_ENTRIES
+)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text so trivially different queries share a cache entry"""
+    normalized = query.strip().lower()
+    normalized = re.sub(r"\s+", " ", normalized)
+    normalized = normalized.strip(" \"'`")
+    return normalized.rstrip(" ?.!")
+
+
+class SearchCache:
+    """SQLite-backed search cache with freshness TTL, size-based eviction and hit/miss counters"""
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # One connection shared by all Streamlit session threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                cache_key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                citations TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_last_accessed ON search_cache (last_accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, model: str) -> str:
+        """Cache key for a query/model pair"""
+        return hashlib.sha256(f"{model}\n{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, query: str, model: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a fresh cached result
+
+        Returns:
+            {'content': str, 'citations': list} or None on a miss or stale entry
+        """
+        key = self.make_key(query, model)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, citations, created_at FROM search_cache WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            content, citations, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE search_cache SET last_accessed = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return {"content": content, "citations": json.loads(citations)}
+
+    def set(self, query: str, model: str, content: str, citations: List[str]):
+        """Store a search result, evicting least recently used entries past max_entries"""
+        key = self.make_key(query, model)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO search_cache
+                    (cache_key, query, model, content, citations, created_at, last_accessed, hit_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                """,
+                (key, query, model, content, json.dumps(citations), now, now)
+            )
+
+            count = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+            if self.max_entries and count > self.max_entries:
+                overflow = count - self.max_entries
+                self._conn.execute(
+                    """
+                    DELETE FROM search_cache WHERE cache_key IN (
+                        SELECT cache_key FROM search_cache ORDER BY last_accessed ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,)
+                )
+                self.evictions += overflow
+
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus current cache size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Get the process-wide search cache (shared across sessions)"""
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = SearchCache(
+                    PERPLEXITY_CACHE_PATH,
+                    ttl_seconds=PERPLEXITY_CACHE_TTL_SECONDS,
+                    max_entries=PERPLEXITY_CACHE_MAX_ENTRIES
+                )
+    return _search_cache
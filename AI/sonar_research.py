@@ -0,0 +1,149 @@
+"""
+Direct Sonar Research
+Perplexity Sonar models search the web themselves, so research stages on a
+Sonar model make one chat completions call with the combined prompt instead
+of wrapping the model in the agent loop with a separate search tool
+"""
+
+import re
+import time
+from typing import Dict, Any, Optional
+
+import requests
+import streamlit as st
+
+from AI.citation_registry import get_citation_registry
+from AI.langchain_llm import get_model_info
+from AI.perplexity_client import post_chat_completion
+from AI.research_agent import log_agent_run
+from keys.config import PERPLEXITY_API_KEY, SONAR_RESEARCH_MAX_TOKENS, SONAR_RESEARCH_READ_TIMEOUT
+
+
+# Reasoning variants prefix the answer with their chain of thought
+THINK_BLOCK_PATTERN = re.compile(r"<think>.*?</think>", flags=re.DOTALL)
+
+
+def is_sonar_model(model_name: str) -> bool:
+    """Whether the model is a Perplexity Sonar model (searches the web itself)"""
+    return get_model_info(model_name)["provider"] == "perplexity"
+
+
+def build_sonar_messages(combined_prompt: str, context: Dict[str, Any]) -> list:
+    """System instructions + context, asking for inline [n] citations"""
+    context_str = "\n\n".join([f"**{k}:** {v}" for k, v in context.items()])
+
+    return [
+        {"role": "system", "content": combined_prompt},
+        {
+            "role": "user",
+            "content": (
+                f"{context_str}\n\n"
+                "Based on the instructions and context above, research current, relevant sources "
+                "and generate the requested output. Cite sources inline with [n] and do not write a reference list."
+            )
+        }
+    ]
+
+
+def run_sonar_research(
+    combined_prompt: str,
+    context: Dict[str, Any],
+    model_name: str,
+    step_name: str = "research",
+    status=None
+) -> Optional[str]:
+    """
+    Research with one Sonar call
+
+    Args:
+        combined_prompt: System instructions (meta + module prompts)
+        context: Dictionary with topic and other context data
+        model_name: Sonar model name from MODEL_MAPPING
+        step_name: Name of the workflow step (for logging)
+        status: Optional st.status container for progress updates
+
+    Returns:
+        Generated research content (with bibliography) or None on error
+    """
+    if not PERPLEXITY_API_KEY:
+        st.error("Perplexity API key not configured. Please add PERPLEXITY_API_KEY to secrets.")
+        return None
+
+    payload = {
+        "model": get_model_info(model_name)["actual_model"],
+        "messages": build_sonar_messages(combined_prompt, context),
+        "temperature": 0.2,
+        "max_tokens": SONAR_RESEARCH_MAX_TOKENS,
+        "return_citations": True,
+        "return_images": False
+    }
+
+    started_at = time.monotonic()
+    try:
+        if status is not None:
+            status.update(label=f"🔍 {model_name} is searching and writing...")
+        data = post_chat_completion(payload, read_timeout=SONAR_RESEARCH_READ_TIMEOUT)
+    except requests.exceptions.Timeout:
+        if status is not None:
+            status.update(label="🔍 Research failed", state="error")
+        st.error(f"{model_name} timed out after {SONAR_RESEARCH_READ_TIMEOUT:.0f}s")
+        return None
+    except requests.exceptions.RequestException as e:
+        if status is not None:
+            status.update(label="🔍 Research failed", state="error")
+        st.error(f"Error running Sonar research: {str(e)}")
+        return None
+    wall_time = time.monotonic() - started_at
+
+    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+    content = THINK_BLOCK_PATTERN.sub("", content).strip()
+    citations = data.get("citations", [])
+    if not content:
+        if status is not None:
+            status.update(label="🔍 Research failed", state="error")
+        st.error(f"{model_name} did not return any content")
+        return None
+
+    # Session citation ids and one bibliography, like the agent and pipeline
+    citation_registry = get_citation_registry()
+    if citation_registry is not None:
+        output = citation_registry.append_bibliography(citation_registry.link_references(content, citations))
+    elif citations:
+        output = f"{content}\n\n## References\n\n" + "\n".join(f"[{i}] {url}" for i, url in enumerate(citations, 1)) + "\n"
+    else:
+        output = content
+
+    usage = data.get("usage", {})
+    input_tokens = usage.get("prompt_tokens", 0)
+    output_tokens = usage.get("completion_tokens", 0)
+    if input_tokens == 0 and output_tokens == 0:
+        from AI.token_utils import count_tokens
+        input_tokens = sum(count_tokens(message["content"]) for message in payload["messages"])
+        output_tokens = count_tokens(content)
+
+    metadata = {
+        "method": "sonar",
+        "iterations": 1,
+        "tool_calls": 0,
+        "budget": {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "llm_calls": 1,
+            "searches": usage.get("num_search_queries", 0)
+        },
+        "metrics": {"wall_time_seconds": round(wall_time, 2)},
+        "citations": len(citations)
+    }
+    try:
+        log_agent_run(step_name, model_name, metadata, output, method="sonar")
+    except Exception as e:
+        print(f"Error logging Sonar research run: {e}")
+
+    if status is not None:
+        try:
+            status.update(label=f"🔍 Research complete · {wall_time:.0f}s · {len(citations)} sources", state="complete")
+        except Exception as e:
+            print(f"Error updating Sonar status: {e}")
+
+    return output
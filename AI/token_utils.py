@@ -0,0 +1,47 @@
+"""
+Token Counting Utilities
+Shared token estimates used when a provider does not report usage. Counts
+are memoized per text, so artifacts counted ahead of time (see
+utils.step_warmup) cost nothing when a step runs.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from keys.config import TOKEN_COUNT_CACHE_SIZE
+
+_encoding = None
+
+
+def _get_encoding():
+    """Load the cl100k_base encoding once per process"""
+    global _encoding
+    if _encoding is None:
+        import tiktoken
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding
+
+
+@lru_cache(maxsize=TOKEN_COUNT_CACHE_SIZE)
+def _count_encoded_tokens(text: str) -> int:
+    return len(_get_encoding().encode(text))
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """
+    Count tokens in a piece of text
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Token count (tiktoken cl100k_base, or ~4 chars per token if unavailable)
+    """
+    if not text:
+        return 0
+
+    try:
+        return _count_encoded_tokens(text)
+    except Exception:
+        # Very rough estimate: ~4 chars per token
+        return len(text) // 4
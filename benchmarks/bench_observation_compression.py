@@ -0,0 +1,129 @@
+"""
+Observation Compression Benchmark
+Runs the same scripted ReAct research run against the Perplexity stand-in with
+observation compression off and on, and plots input tokens per iteration
+
+    python benchmarks/bench_observation_compression.py --searches 6 --answer-sentences 40
+"""
+
+import argparse
+import os
+import sys
+from itertools import zip_longest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+
+from benchmarks.bench_research_agent import ScriptedChatModel, _SessionState
+from benchmarks.perplexity_standin import add_config_arguments, config_from_args, start_standin_server
+
+
+# Distinct queries so near-duplicate suppression does not skip any search
+COMPRESSION_QUERIES = [
+    "generative AI adoption in retail banking",
+    "credit risk model explainability regulation",
+    "clinical simulation training outcomes",
+    "cohort based learning completion rates",
+    "relationship manager advisory workload trends",
+    "machine learning upskilling programs for analysts",
+    "hospital onboarding curriculum standardization",
+    "fintech payments fraud detection skills",
+]
+
+
+def scripted_react_run(searches: int):
+    steps = [
+        f"Thought: I need more information.\nAction: perplexity_search\nAction Input: {query}"
+        for query in COMPRESSION_QUERIES[:searches]
+    ]
+    steps.append("Thought: I now have enough information.\nFinal Answer: Research summary for the benchmark topic.")
+    return steps
+
+
+def run_once(research_agent, searches: int, compression: bool, runs: list):
+    """One research run; returns input tokens of each LLM call (iteration)"""
+    research_agent.OBSERVATION_COMPRESSION_ENABLED = compression
+    fake_model = ScriptedChatModel(responses=scripted_react_run(searches))
+    research_agent.get_chat_model = lambda *a, **k: fake_model
+
+    runs.clear()
+    research_agent.run_research_agent(
+        combined_prompt="Research the topic and summarize key findings with sources.",
+        context={"topic": "AI skills in retail banking"},
+        model_name="gpt-5",
+        step_name="benchmark",
+        mode=research_agent.AGENT_MODE_REACT
+    )
+    metrics = runs[-1].get("metrics", {}) if runs else {}
+    return [call["input_tokens"] for call in metrics.get("llm_calls", [])], metrics.get("observation_compression")
+
+
+def plot(before, after, output_path):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed; skipping the plot")
+        return
+
+    fig, ax = plt.subplots(figsize=(8, 4.5))
+    ax.plot(range(1, len(before) + 1), before, marker="o", label=f"uncompressed (total {sum(before):,})")
+    ax.plot(range(1, len(after) + 1), after, marker="o", label=f"compressed (total {sum(after):,})")
+    ax.set_xlabel("Agent iteration (LLM call)")
+    ax.set_ylabel("Input tokens")
+    ax.set_title("Research agent input tokens per iteration")
+    ax.grid(alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=120)
+    print(f"Plot saved to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark observation compression on the agent scratchpad")
+    parser.add_argument("--searches", type=int, default=6, help="Search iterations per run")
+    parser.add_argument("--output", default="observation_compression.png", help="Where to save the plot")
+    add_config_arguments(parser)
+    parser.set_defaults(mean_ms=50, answer_sentences=40)
+    args = parser.parse_args()
+
+    st.session_state = _SessionState()
+    st.error = lambda message, *a, **k: print(f"Error: {message}")
+
+    import AI.perplexity_client as perplexity_client
+    import AI.research_agent as research_agent
+
+    server, base_url = start_standin_server(config=config_from_args(args))
+    perplexity_client.PERPLEXITY_API_URL = base_url
+    research_agent.PERPLEXITY_CACHE_ENABLED = False
+    research_agent.RESEARCH_MAX_TOKENS = 0  # measure growth, do not cut the run short
+    if not research_agent.PERPLEXITY_API_KEY:
+        research_agent.PERPLEXITY_API_KEY = "standin"
+
+    runs = []
+    research_agent.log_agent_run = lambda step_name, model_name, metadata, output: runs.append(metadata)
+
+    searches = min(args.searches, len(COMPRESSION_QUERIES))
+    before, _ = run_once(research_agent, searches, compression=False, runs=runs)
+    after, compression_stats = run_once(research_agent, searches, compression=True, runs=runs)
+    server.shutdown()
+
+    print(f"\n{'iteration':>10}{'uncompressed':>15}{'compressed':>13}")
+    for i, (raw, compressed) in enumerate(zip_longest(before, after), 1):
+        raw = f"{raw:,}" if raw is not None else "-"
+        compressed = f"{compressed:,}" if compressed is not None else "-"
+        print(f"{i:>10}{raw:>15}{compressed:>13}")
+    if len(after) > len(before):
+        print("(the extra compressed call rewrites the Final Answer from the full observations)")
+    print(f"{'total':>10}{sum(before):>15,}{sum(after):>13,}")
+    if before:
+        print(f"\nInput tokens saved: {1 - sum(after) / sum(before):.0%}")
+    print(f"Observation compression: {compression_stats}")
+
+    plot(before, after, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Prompt Fetch Path Benchmark
+Compares the two ways of fetching prompt/mock text from Google Docs:
+  docs    documents().get structural JSON, walked by extract_document_text
+  export  Drive files.export(mimeType='text/plain')
+reporting payload bytes (response body as received by the client, after
+transport decompression), request latency and client-side processing time.
+
+Live mode reads every configured prompt and mock doc with the service account
+(the same credentials as `python -m utils.prompt_bundle sync`):
+
+    python benchmarks/bench_prompt_fetch.py --rounds 3
+
+Synthetic mode needs no credentials and compares payload size and processing
+time on the generated document from bench_document_extraction (no latency):
+
+    python benchmarks/bench_prompt_fetch.py --synthetic --pages 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.google_docs_fetcher import MOCK_DOCUMENT_IDS, PROMPT_DOCUMENT_IDS, extract_document_text
+
+
+def raw_body(request) -> bytes:
+    """Execute a googleapiclient request and return the undecoded response body"""
+    request.postproc = lambda response, content: content
+    return request.execute()
+
+
+def fetch_docs(docs_service, drive_service, document_id):
+    started_at = time.perf_counter()
+    body = raw_body(docs_service.documents().get(documentId=document_id))
+    fetched_at = time.perf_counter()
+    text = extract_document_text(json.loads(body))
+    return len(body), fetched_at - started_at, time.perf_counter() - fetched_at, text
+
+
+def fetch_export(docs_service, drive_service, document_id):
+    started_at = time.perf_counter()
+    body = raw_body(drive_service.files().export(fileId=document_id, mimeType='text/plain'))
+    fetched_at = time.perf_counter()
+    text = body.decode('utf-8').lstrip('\ufeff').replace('\r\n', '\n').strip()
+    return len(body), fetched_at - started_at, time.perf_counter() - fetched_at, text
+
+
+METHODS = [("docs", fetch_docs), ("export", fetch_export)]
+
+
+def print_header():
+    header = f"{'document':<42}{'method':<8}{'bytes':>11}{'latency ms':>12}{'process ms':>12}{'chars':>10}"
+    print(header)
+    print("-" * len(header))
+    return header
+
+
+def run_live(rounds: int):
+    from googleapiclient.discovery import build
+    from utils.google_auth import get_service_account_credentials
+    from utils.prompt_bundle import SYNC_SCOPES
+
+    credentials = get_service_account_credentials(SYNC_SCOPES)
+    docs_service = build('docs', 'v1', credentials=credentials)
+    drive_service = build('drive', 'v3', credentials=credentials)
+
+    documents = {}
+    for kind, document_ids in [("prompt", PROMPT_DOCUMENT_IDS), ("mock", MOCK_DOCUMENT_IDS)]:
+        for name, document_id in document_ids.items():
+            if document_id and document_id not in documents.values():
+                documents[f"{kind}:{name}"] = document_id
+
+    totals = {label: {"bytes": 0, "latency": 0.0, "process": 0.0} for label, _ in METHODS}
+    header = print_header()
+    for name, document_id in documents.items():
+        for label, fetch in METHODS:
+            samples = []
+            for _ in range(rounds):
+                try:
+                    samples.append(fetch(docs_service, drive_service, document_id))
+                except Exception as e:
+                    print(f"Error fetching {name} via {label}: {e}")
+                    break
+            if not samples:
+                continue
+            size = samples[0][0]
+            latency = statistics.median(sample[1] for sample in samples)
+            process = statistics.median(sample[2] for sample in samples)
+            totals[label]["bytes"] += size
+            totals[label]["latency"] += latency
+            totals[label]["process"] += process
+            print(f"{name[:41]:<42}{label:<8}{size:>11,}{latency * 1000:>12.0f}{process * 1000:>12.1f}"
+                  f"{len(samples[0][3]):>10,}")
+
+    print("-" * len(header))
+    for label, total in totals.items():
+        print(f"{'total (' + str(len(documents)) + ' docs)':<42}{label:<8}{total['bytes']:>11,}"
+              f"{total['latency'] * 1000:>12.0f}{total['process'] * 1000:>12.1f}")
+
+
+def run_synthetic(pages: int, rounds: int):
+    from bench_document_extraction import DocumentBuilder
+
+    document = DocumentBuilder().document(pages)
+    docs_body = json.dumps(document, indent=2).encode('utf-8')
+    # Stand-in for the export response: the walked text with the export's BOM and CRLF line endings
+    export_body = ('\ufeff' + extract_document_text(document).replace('\n', '\r\n')).encode('utf-8')
+
+    def process_docs():
+        return extract_document_text(json.loads(docs_body))
+
+    def process_export():
+        return export_body.decode('utf-8').lstrip('\ufeff').replace('\r\n', '\n').strip()
+
+    print_header()
+    for label, body, process in [("docs", docs_body, process_docs), ("export", export_body, process_export)]:
+        timings = []
+        for _ in range(rounds):
+            started_at = time.perf_counter()
+            text = process()
+            timings.append(time.perf_counter() - started_at)
+        print(f"{'synthetic ' + str(pages) + ' pages':<42}{label:<8}{len(body):>11,}{'-':>12}"
+              f"{statistics.median(timings) * 1000:>12.1f}{len(text):>10,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Docs API vs Drive export prompt fetches")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--synthetic", action="store_true", help="Offline comparison on a generated document")
+    parser.add_argument("--pages", type=int, default=200, help="Synthetic document size in pages")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        run_synthetic(args.pages, args.rounds)
+    else:
+        run_live(args.rounds)
+
+
+if __name__ == "__main__":
+    main()
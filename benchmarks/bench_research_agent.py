@@ -0,0 +1,220 @@
+"""
+Research Agent Benchmark
+Measures end-to-end agent latency and iteration counts against the local
+Perplexity stand-in server
+
+By default the agent LLM is a scripted chat model (fixed ReAct transcript with
+a configurable think time) so only the search path is exercised and no API
+keys are needed. Pass --model to drive a real LLM instead.
+
+    python benchmarks/bench_research_agent.py --runs 5 --modes react parallel tool_calling
+    python benchmarks/bench_research_agent.py --model gpt-5-mini --latency lognormal --mean-ms 900
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from benchmarks.perplexity_standin import add_config_arguments, config_from_args, start_standin_server
+
+
+BENCH_QUERIES = [
+    "AI adoption in retail banking",
+    "banking workforce skills gaps",
+    "generative AI training programs for financial services",
+    "measuring learning impact in banks",
+]
+
+
+class _SessionState(dict):
+    """Attribute-style dict used in place of st.session_state outside `streamlit run`"""
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+
+class ScriptedChatModel(FakeListChatModel):
+    """Replays a fixed transcript, pausing once per call to simulate model think time"""
+
+    think_seconds: float = 0.0
+
+    def _call(self, *args, **kwargs):
+        time.sleep(self.think_seconds)
+        return super()._call(*args, **kwargs)
+
+    def _stream(self, *args, **kwargs):
+        time.sleep(self.think_seconds)
+        yield from super()._stream(*args, **kwargs)
+
+
+class ScriptedToolCallingModel(BaseChatModel):
+    """Replays fixed AI messages (with native tool calls) for the tool-calling agent"""
+
+    messages: list
+    think_seconds: float = 0.0
+    i: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-tool-calling"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.think_seconds)
+        message = self.messages[min(self.i, len(self.messages) - 1)]
+        self.i += 1
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def scripted_model(mode: str, searches: int, think_seconds: float):
+    """Scripted chat model for one benchmark run"""
+    from AI.research_agent import AGENT_MODE_TOOL_CALLING
+
+    if mode == AGENT_MODE_TOOL_CALLING:
+        return ScriptedToolCallingModel(
+            messages=[
+                AIMessage(content="", tool_calls=[{
+                    "name": "perplexity_multi_search",
+                    "args": {"queries": BENCH_QUERIES[:searches]},
+                    "id": "call_1",
+                }]),
+                AIMessage(content="Research summary for the benchmark topic."),
+            ],
+            think_seconds=think_seconds
+        )
+
+    return ScriptedChatModel(responses=scripted_responses(mode, searches), think_seconds=think_seconds)
+
+
+def scripted_responses(mode: str, searches: int):
+    """ReAct transcript the scripted model replays for one run"""
+    from AI.research_agent import AGENT_MODE_PARALLEL
+
+    queries = BENCH_QUERIES[:searches]
+    if mode == AGENT_MODE_PARALLEL:
+        steps = [
+            'Thought: I should research several angles at once.\n'
+            'Action: perplexity_multi_search\n'
+            f'Action Input: {queries!r}'.replace("'", '"')
+        ]
+    else:
+        steps = [
+            f"Thought: I need more information.\nAction: perplexity_search\nAction Input: {query}"
+            for query in queries
+        ]
+    steps.append("Thought: I now have enough information.\nFinal Answer: Research summary for the benchmark topic.")
+    return steps
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmark(args):
+    import AI.perplexity_client as perplexity_client
+    import AI.research_agent as research_agent
+
+    server, base_url = start_standin_server(config=config_from_args(args))
+    perplexity_client.PERPLEXITY_API_URL = base_url
+    research_agent.PERPLEXITY_CACHE_ENABLED = False  # every search must hit the server
+    if not research_agent.PERPLEXITY_API_KEY:
+        research_agent.PERPLEXITY_API_KEY = "standin"
+
+    # Collect run metadata instead of writing to TokenTracker / Google Sheets
+    runs = []
+    research_agent.log_agent_run = lambda step_name, model_name, metadata, output: runs.append(metadata)
+
+    print(f"Stand-in server: {base_url} (latency={args.latency}, mean={args.mean_ms}ms, "
+          f"errors={args.error_rate:.0%}, timeouts={args.timeout_rate:.0%})")
+    print(f"Agent model: {args.model or f'scripted ({args.llm_ms:.0f}ms think time)'}\n")
+
+    header = f"{'mode':<14}{'runs':>6}{'p50 s':>9}{'p95 s':>9}{'mean s':>9}{'iters':>8}{'searches':>10}{'llm calls':>11}{'failed':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for mode in args.modes:
+        latencies = []
+        iterations = []
+        searches = []
+        llm_calls = []
+        failed = 0
+
+        for _ in range(args.runs):
+            if not args.model:
+                fake_model = scripted_model(mode, args.searches, args.llm_ms / 1000)
+                research_agent.get_chat_model = lambda *a, **k: fake_model
+
+            runs.clear()
+            started_at = time.perf_counter()
+            output = research_agent.run_research_agent(
+                combined_prompt="Research the topic and summarize key findings with sources.",
+                context={"topic": args.topic},
+                model_name=args.model or "gpt-5",
+                step_name="benchmark",
+                mode=mode
+            )
+            latencies.append(time.perf_counter() - started_at)
+
+            if output is None or not runs:
+                failed += 1
+                continue
+            metadata = runs[-1]
+            iterations.append(metadata.get("iterations", 0))
+            searches.append(metadata.get("budget", {}).get("searches", 0))
+            llm_calls.append(len(metadata.get("metrics", {}).get("llm_calls", [])))
+
+        print(
+            f"{mode:<14}{args.runs:>6}{percentile(latencies, 50):>9.2f}{percentile(latencies, 95):>9.2f}"
+            f"{statistics.mean(latencies):>9.2f}"
+            f"{statistics.mean(iterations) if iterations else 0:>8.1f}"
+            f"{statistics.mean(searches) if searches else 0:>10.1f}"
+            f"{statistics.mean(llm_calls) if llm_calls else 0:>11.1f}"
+            f"{failed:>8}"
+        )
+
+    print(f"\nStand-in stats: {server.config.stats()}")
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research agent against the Perplexity stand-in")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode")
+    parser.add_argument("--modes", nargs="+", default=["react", "parallel", "tool_calling"])
+    parser.add_argument("--model", default=None, help="Real model name (default: scripted model)")
+    parser.add_argument("--llm-ms", type=float, default=200, help="Scripted model think time per call")
+    parser.add_argument("--searches", type=int, default=3, help="Searches per scripted run")
+    parser.add_argument("--topic", default="AI in retail banking")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    # Outside `streamlit run` there is no script run context for session state or st.error
+    st.session_state = _SessionState()
+    st.error = lambda message, *a, **k: print(f"Error: {message}")
+
+    run_benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
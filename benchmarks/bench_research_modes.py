@@ -0,0 +1,133 @@
+"""
+Research Modes Benchmark
+Compares direct generation, the research agent, the plan-search-synthesize
+pipeline and direct Sonar research on latency, sequential LLM round trips, searches and tokens, with
+searches served by the local Perplexity stand-in
+
+    python benchmarks/bench_research_modes.py --runs 3 --mean-ms 1500 --llm-ms 4000
+    python benchmarks/bench_research_modes.py --model gpt-5-mini --runs 2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+
+from benchmarks.bench_research_agent import BENCH_QUERIES, ScriptedChatModel, _SessionState, scripted_model
+from benchmarks.perplexity_standin import add_config_arguments, config_from_args, start_standin_server
+
+
+PROMPT = "Research the topic and summarize key findings with sources."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark direct generation vs research agent vs research pipeline")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per method")
+    parser.add_argument("--agent-modes", nargs="+", default=["react", "parallel", "tool_calling"])
+    parser.add_argument("--model", default=None, help="Real model name (default: scripted model)")
+    parser.add_argument("--llm-ms", type=float, default=1500, help="Scripted model think time per call")
+    parser.add_argument("--searches", type=int, default=4, help="Searches per scripted run")
+    parser.add_argument("--topic", default="AI in retail banking")
+    add_config_arguments(parser)
+    parser.set_defaults(mean_ms=1200)
+    args = parser.parse_args()
+
+    st.session_state = _SessionState()
+    st.session_state.selected_ai_model = args.model or "gpt-5"
+    st.error = lambda message, *a, **k: print(f"Error: {message}")
+
+    import AI.generate_ai_response as generate_ai_response
+    import AI.perplexity_client as perplexity_client
+    import AI.research_agent as research_agent
+    import AI.research_pipeline as research_pipeline
+    import AI.sonar_research as sonar_research
+
+    server, base_url = start_standin_server(config=config_from_args(args))
+    perplexity_client.PERPLEXITY_API_URL = base_url
+    research_agent.PERPLEXITY_CACHE_ENABLED = False
+    if not research_agent.PERPLEXITY_API_KEY:
+        research_agent.PERPLEXITY_API_KEY = "standin"
+        sonar_research.PERPLEXITY_API_KEY = "standin"
+
+    # Collect metadata instead of writing to TokenTracker / Google Sheets
+    runs = []
+    collect = lambda step_name, model_name, metadata, output, method="agent": runs.append(metadata)
+    research_agent.log_agent_run = collect
+    research_pipeline.log_agent_run = collect
+    sonar_research.log_agent_run = collect
+    direct_usage = []
+    generate_ai_response.log_ai_usage = lambda step, model, inp, out, content, ai_model_label=None: direct_usage.append(inp + out)
+
+    model_name = args.model or "gpt-5"
+    think_seconds = args.llm_ms / 1000
+    queries = BENCH_QUERIES[:args.searches]
+
+    def use_model(model):
+        if args.model:
+            return
+        research_agent.get_chat_model = lambda *a, **k: model
+        research_pipeline.get_chat_model = lambda *a, **k: model
+        generate_ai_response.get_chat_model = lambda *a, **k: model
+
+    methods = [("direct", None)] + [(f"agent:{mode}", mode) for mode in args.agent_modes] + [("pipeline", None), ("sonar", None)]
+
+    print(f"Stand-in server: {base_url} (latency={args.latency}, mean={args.mean_ms}ms)")
+    print(f"Model: {args.model or f'scripted ({args.llm_ms:.0f}ms per call)'}\n")
+    header = f"{'method':<20}{'p50 s':>8}{'mean s':>8}{'llm calls':>11}{'searches':>10}{'tokens':>9}"
+    print(header)
+    print("-" * len(header))
+
+    for label, mode in methods:
+        latencies, llm_calls, searches, tokens = [], [], [], []
+        for _ in range(args.runs):
+            runs.clear()
+            direct_usage.clear()
+            started_at = time.perf_counter()
+
+            if label == "direct":
+                use_model(ScriptedChatModel(responses=["Direct research summary."], think_seconds=think_seconds))
+                generate_ai_response.generate_ai_response(PROMPT, {"topic": args.topic}, "benchmark")
+                latencies.append(time.perf_counter() - started_at)
+                llm_calls.append(1)
+                searches.append(0)
+                tokens.append(sum(direct_usage))
+                continue
+
+            if label == "sonar":
+                # One Sonar call; the stand-in answers it like a search
+                sonar_research.run_sonar_research(PROMPT, {"topic": args.topic}, "perplexity-sonar-reasoning", "benchmark")
+            elif label == "pipeline":
+                use_model(ScriptedChatModel(
+                    responses=[json.dumps(queries), "Pipeline research summary [C1]."],
+                    think_seconds=think_seconds
+                ))
+                research_pipeline.run_research_pipeline(PROMPT, {"topic": args.topic}, model_name, "benchmark")
+            else:
+                use_model(scripted_model(mode, args.searches, think_seconds))
+                research_agent.run_research_agent(PROMPT, {"topic": args.topic}, model_name, "benchmark", mode=mode)
+            latencies.append(time.perf_counter() - started_at)
+
+            if runs:
+                budget = runs[-1].get("budget", {})
+                llm_calls.append(budget.get("llm_calls", 0))
+                searches.append(budget.get("searches", 0))
+                tokens.append(budget.get("total_tokens", 0))
+
+        print(
+            f"{label:<20}{statistics.median(latencies):>8.2f}{statistics.mean(latencies):>8.2f}"
+            f"{statistics.mean(llm_calls) if llm_calls else 0:>11.1f}"
+            f"{statistics.mean(searches) if searches else 0:>10.1f}"
+            f"{statistics.mean(tokens) if tokens else 0:>9.0f}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Perplexity Stand-in Server
+Local HTTP server implementing the /chat/completions shape the research agent's
+search tool expects (choices + citations), with configurable latency, canned
+per-topic corpora and error injection
+
+Run standalone:
+    python benchmarks/perplexity_standin.py --port 8765 --latency lognormal --mean-ms 800
+
+then set PERPLEXITY_API_BASE = "http://127.0.0.1:8765" in .streamlit/secrets.toml.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Canned corpora: topic -> keywords used to match a query, passages and sources
+CORPORA = {
+    "ai": {
+        "keywords": ["ai", "artificial", "intelligence", "machine", "learning", "llm", "generative", "model"],
+        "passages": [
+            "Enterprise adoption of generative AI roughly doubled year over year, with most organizations piloting at least one use case in customer operations or software engineering.",
+            "The main barriers reported to scaling AI are data quality, a shortage of skilled practitioners and unclear governance for model risk.",
+            "Upskilling programs that pair short conceptual modules with hands-on labs show the highest completion rates for AI literacy training.",
+        ],
+        "citations": [
+            "https://standin.example/ai/state-of-ai-report",
+            "https://standin.example/ai/enterprise-adoption-survey",
+            "https://standin.example/ai/workforce-upskilling",
+        ],
+    },
+    "banking": {
+        "keywords": ["bank", "banking", "finance", "financial", "fintech", "payments", "credit", "risk"],
+        "passages": [
+            "Retail banks are shifting training budgets toward digital channels, fraud detection and regulatory compliance.",
+            "Regulators increasingly expect explainability for credit decisions made with automated models.",
+            "Relationship managers spend a growing share of time on advisory work as routine servicing moves to self-service apps.",
+        ],
+        "citations": [
+            "https://standin.example/banking/digital-transformation",
+            "https://standin.example/banking/model-risk-guidance",
+            "https://standin.example/banking/workforce-trends",
+        ],
+    },
+    "healthcare": {
+        "keywords": ["health", "healthcare", "hospital", "clinical", "patient", "medical", "nurse"],
+        "passages": [
+            "Clinical staff report documentation burden as the top driver of burnout.",
+            "Simulation-based training improves retention of emergency procedures compared with lecture formats.",
+            "Health systems are standardizing onboarding curricula across sites to reduce time to competency.",
+        ],
+        "citations": [
+            "https://standin.example/health/clinician-survey",
+            "https://standin.example/health/simulation-training",
+            "https://standin.example/health/onboarding-standards",
+        ],
+    },
+    "learning": {
+        "keywords": ["learning", "training", "course", "curriculum", "learner", "sprint", "design", "instructional", "skills"],
+        "passages": [
+            "Spaced practice and retrieval exercises outperform massed study for long-term retention.",
+            "Cohort-based programs with weekly deliverables report completion rates several times higher than self-paced courses.",
+            "Learning teams increasingly measure impact with on-the-job performance metrics rather than completion alone.",
+        ],
+        "citations": [
+            "https://standin.example/learning/retrieval-practice",
+            "https://standin.example/learning/cohort-completion",
+            "https://standin.example/learning/impact-measurement",
+        ],
+    },
+}
+
+DEFAULT_CORPUS = {
+    "passages": [
+        "Industry analysts expect continued investment in workforce capability building over the next three years.",
+        "Organizations that tie training to specific business outcomes report higher executive sponsorship.",
+    ],
+    "citations": [
+        "https://standin.example/general/industry-outlook",
+        "https://standin.example/general/capability-building",
+    ],
+}
+
+
+class StandinConfig:
+    """
+    Behaviour of the stand-in server
+
+    latency: 'fixed' (mean_ms), 'uniform' (mean_ms +/- jitter_ms) or
+             'lognormal' (median mean_ms, sigma controls the tail)
+    error_rate: fraction of requests answered with error_status
+    timeout_rate: fraction of requests that stall for hang_seconds before answering
+    answer_sentences: pad answers to this many sentences with passages from the
+                      other corpora (real answers run to ~2000 tokens)
+    """
+
+    def __init__(
+        self,
+        latency: str = "fixed",
+        mean_ms: float = 300,
+        jitter_ms: float = 100,
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        timeout_rate: float = 0.0,
+        hang_seconds: float = 90,
+        answer_sentences: int = 0,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.answer_sentences = answer_sentences
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def sample_delay(self) -> float:
+        """Response delay in seconds for one request"""
+        with self._lock:
+            if self.latency == "uniform":
+                delay_ms = self._random.uniform(self.mean_ms - self.jitter_ms, self.mean_ms + self.jitter_ms)
+            elif self.latency == "lognormal":
+                delay_ms = self._random.lognormvariate(0, self.sigma) * self.mean_ms
+            else:
+                delay_ms = self.mean_ms
+        return max(0.0, delay_ms) / 1000
+
+    def draw_fault(self) -> Optional[str]:
+        """'error', 'timeout' or None for one request"""
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+            if roll < self.error_rate:
+                self.errors += 1
+                return "error"
+            if roll < self.error_rate + self.timeout_rate:
+                self.timeouts += 1
+                return "timeout"
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "errors": self.errors, "timeouts": self.timeouts}
+
+
+def match_corpus(query: str) -> Tuple[List[str], List[str]]:
+    """Pick passages and citations from the corpora whose keywords appear in the query"""
+    words = set(query.lower().replace("-", " ").split())
+    passages = []
+    citations = []
+    for corpus in CORPORA.values():
+        if words & set(corpus["keywords"]):
+            passages.extend(corpus["passages"])
+            citations.extend(corpus["citations"])
+
+    if not passages:
+        passages = list(DEFAULT_CORPUS["passages"])
+        citations = list(DEFAULT_CORPUS["citations"])
+    return passages, citations
+
+
+def build_completion(query: str, model: str, answer_sentences: int = 0) -> Dict[str, Any]:
+    """Perplexity-shaped chat completion for a query"""
+    passages, citations = match_corpus(query)
+
+    if answer_sentences > len(passages):
+        # Pad with loosely related material, as long real answers contain
+        filler = [p for corpus in CORPORA.values() for p in corpus["passages"] if p not in passages]
+        filler += DEFAULT_CORPUS["passages"]
+        padded = list(passages)
+        while len(padded) < answer_sentences:
+            padded.append(filler[len(padded) % len(filler)])
+        passages = padded
+
+    content = f"Findings for \"{query}\":\n\n" + "\n".join(
+        f"- {passage} [{(i - 1) % len(citations) + 1}]" for i, passage in enumerate(passages, 1)
+    )
+    prompt_tokens = max(1, len(query) // 4)
+    completion_tokens = max(1, len(content) // 4)
+
+    return {
+        "id": f"standin-{int(time.time() * 1000)}",
+        "model": model,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "citations": citations,
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content},
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def make_handler(config: StandinConfig):
+    """Request handler class bound to a config"""
+
+    class StandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length) if length else b""
+
+            if self.path.rstrip("/") != "/chat/completions":
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                self._send_json(401, {"error": {"message": "Missing bearer token"}})
+                return
+
+            try:
+                payload = json.loads(raw or b"{}")
+                messages = payload.get("messages", [])
+                query = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+            except (ValueError, AttributeError):
+                self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                return
+
+            fault = config.draw_fault()
+            if fault == "timeout":
+                time.sleep(config.hang_seconds)
+            else:
+                time.sleep(config.sample_delay())
+
+            if fault == "error":
+                self._send_json(config.error_status, {"error": {"message": "Injected error from stand-in server"}})
+                return
+
+            self._send_json(200, build_completion(query, payload.get("model", "standin"), config.answer_sentences))
+
+    return StandinHandler
+
+
+def start_standin_server(host: str = "127.0.0.1", port: int = 0, config: Optional[StandinConfig] = None):
+    """
+    Start the stand-in server on a background thread
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        config: Server behaviour (defaults to StandinConfig())
+
+    Returns:
+        (server, base_url) - call server.shutdown() to stop it
+    """
+    config = config or StandinConfig()
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    server.config = config
+
+    thread = threading.Thread(target=server.serve_forever, name="perplexity-standin", daemon=True)
+    thread.start()
+
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """Command-line options for StandinConfig (shared with the benchmarks)"""
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="fixed")
+    parser.add_argument("--mean-ms", type=float, default=300, help="Mean (fixed/uniform) or median (lognormal) latency")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="Half-width of the uniform latency range")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal shape (larger = heavier tail)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that return an HTTP error")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that stall")
+    parser.add_argument("--hang-seconds", type=float, default=90, help="How long stalled requests hang")
+    parser.add_argument("--answer-sentences", type=int, default=0, help="Pad answers to this many sentences")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> StandinConfig:
+    return StandinConfig(
+        latency=args.latency,
+        mean_ms=args.mean_ms,
+        jitter_ms=args.jitter_ms,
+        sigma=args.sigma,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        answer_sentences=args.answer_sentences,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Perplexity /chat/completions stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    config = config_from_args(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"Perplexity stand-in listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Stand-in stats: {config.stats()}")
+
+
+if __name__ == "__main__":
+    main()
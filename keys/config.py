@@ -16,6 +16,88 @@ PERPLEXITY_API_KEY = st.secrets.get("PERPLEXITY_API_KEY", "")
 # Anthropic API Key (for Claude models)
 ANTHROPIC_API_KEY = st.secrets.get("ANTHROPIC_API_KEY", "")
 
+# Perplexity HTTP Client (pooled keep-alive connections, timeouts in seconds)
+# PERPLEXITY_API_BASE can point at a local stand-in (benchmarks/perplexity_standin.py)
+PERPLEXITY_API_BASE = st.secrets.get("PERPLEXITY_API_BASE", "https://api.perplexity.ai")
+PERPLEXITY_POOL_SIZE = int(st.secrets.get("PERPLEXITY_POOL_SIZE", 10))
+PERPLEXITY_CONNECT_TIMEOUT = float(st.secrets.get("PERPLEXITY_CONNECT_TIMEOUT", 5))
+PERPLEXITY_READ_TIMEOUT = float(st.secrets.get("PERPLEXITY_READ_TIMEOUT", 30))
+
+# Perplexity Search Cache (local SQLite, shared across sessions)
+PERPLEXITY_CACHE_ENABLED = st.secrets.get("PERPLEXITY_CACHE_ENABLED", True)
+PERPLEXITY_CACHE_PATH = st.secrets.get("PERPLEXITY_CACHE_PATH", ".cache/perplexity_search_cache.sqlite")
+PERPLEXITY_CACHE_TTL_SECONDS = int(st.secrets.get("PERPLEXITY_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60))
+PERPLEXITY_CACHE_MAX_ENTRIES = int(st.secrets.get("PERPLEXITY_CACHE_MAX_ENTRIES", 2000))
+
+# Research Agent
+RESEARCH_AGENT_MODE = st.secrets.get("RESEARCH_AGENT_MODE", "react")  # "react", "parallel", "tool_calling" or "auto"
+RESEARCH_MAX_QUERIES_PER_STEP = int(st.secrets.get("RESEARCH_MAX_QUERIES_PER_STEP", 4))
+PERPLEXITY_MAX_CONCURRENCY = int(st.secrets.get("PERPLEXITY_MAX_CONCURRENCY", 4))
+
+# Plan-search-synthesize research pipeline: number of search queries planned per step
+RESEARCH_PIPELINE_QUERIES = int(st.secrets.get("RESEARCH_PIPELINE_QUERIES", 5))
+
+# Direct Sonar research: Sonar models search the web themselves, so research stages call them once
+SONAR_RESEARCH_MAX_TOKENS = int(st.secrets.get("SONAR_RESEARCH_MAX_TOKENS", 8000))
+SONAR_RESEARCH_READ_TIMEOUT = float(st.secrets.get("SONAR_RESEARCH_READ_TIMEOUT", 180))
+
+# Research Agent Budget (0 = unlimited); when hit, a Final Answer is forced from gathered observations
+RESEARCH_MAX_SECONDS = float(st.secrets.get("RESEARCH_MAX_SECONDS", 120))
+RESEARCH_MAX_TOKENS = int(st.secrets.get("RESEARCH_MAX_TOKENS", 80000))
+RESEARCH_MAX_SEARCHES = int(st.secrets.get("RESEARCH_MAX_SEARCHES", 8))
+
+# Observation compression: keep only the most relevant sentences of long search results in the agent scratchpad
+OBSERVATION_COMPRESSION_ENABLED = st.secrets.get("OBSERVATION_COMPRESSION_ENABLED", True)
+OBSERVATION_MAX_SENTENCES = int(st.secrets.get("OBSERVATION_MAX_SENTENCES", 8))
+OBSERVATION_COMPRESS_MIN_TOKENS = int(st.secrets.get("OBSERVATION_COMPRESS_MIN_TOKENS", 300))
+# Compression is lossy: the agent's Final Answer only sees the kept sentences. Enable to rewrite it from the full
+# observations when any were compressed (one extra LLM call over the full text; costs more tokens than compression saves)
+OBSERVATION_FULL_TEXT_SYNTHESIS = st.secrets.get("OBSERVATION_FULL_TEXT_SYNTHESIS", False)
+
+# Local artifact search: full-text index of earlier research outputs (all sessions), searched before the web
+ARTIFACT_SEARCH_ENABLED = st.secrets.get("ARTIFACT_SEARCH_ENABLED", True)
+ARTIFACT_INDEX_PATH = st.secrets.get("ARTIFACT_INDEX_PATH", ".cache/research_artifacts.sqlite")
+ARTIFACT_SEARCH_RESULTS = int(st.secrets.get("ARTIFACT_SEARCH_RESULTS", 3))
+
+# Research agent checkpoints: progress is saved after every iteration so an interrupted run resumes
+AGENT_CHECKPOINT_ENABLED = st.secrets.get("AGENT_CHECKPOINT_ENABLED", True)
+AGENT_CHECKPOINT_DIR = st.secrets.get("AGENT_CHECKPOINT_DIR", ".cache/agent_checkpoints")
+AGENT_CHECKPOINT_MAX_AGE_SECONDS = int(st.secrets.get("AGENT_CHECKPOINT_MAX_AGE_SECONDS", 24 * 60 * 60))
+
+# Near-duplicate query suppression (token-set / shingle similarity, 0-1)
+RESEARCH_DUPLICATE_THRESHOLD = float(st.secrets.get("RESEARCH_DUPLICATE_THRESHOLD", 0.8))
+
+# Prompt Source: "docs" (Google Docs through the prompt cache) or "bundle" (local snapshot written by
+# `python -m utils.prompt_bundle sync`; no Docs calls at runtime, works headless and offline)
+PROMPT_SOURCE = st.secrets.get("PROMPT_SOURCE", "docs")
+PROMPT_BUNDLE_PATH = st.secrets.get("PROMPT_BUNDLE_PATH", ".cache/prompt_bundle.lxpb")
+# How prompt and mock text is fetched from Google Docs (callers may override per call):
+# "docs" walks the Docs API document structure (tables rendered as markdown), "export" uses Drive's
+# plain-text export (smaller payload, no structural JSON; tables come out as plain lines)
+PROMPT_FETCH_METHOD = st.secrets.get("PROMPT_FETCH_METHOD", "docs")
+
+# Prompt Cache (process-wide, shared across sessions): prompt docs are revalidated against Drive's
+# modifiedTime/version at most every PROMPT_CACHE_REVALIDATE_SECONDS and re-downloaded only when changed
+PROMPT_CACHE_ENABLED = st.secrets.get("PROMPT_CACHE_ENABLED", True)
+PROMPT_CACHE_REVALIDATE_SECONDS = float(st.secrets.get("PROMPT_CACHE_REVALIDATE_SECONDS", 30))
+# Load every prompt doc into the cache in the background at session start (concurrent fetches)
+PROMPT_PREFETCH_ENABLED = st.secrets.get("PROMPT_PREFETCH_ENABLED", True)
+PROMPT_PREFETCH_WORKERS = int(st.secrets.get("PROMPT_PREFETCH_WORKERS", 8))
+# Watch prompt docs through the Drive Changes API (one changes.list call per interval for all prompts);
+# while the watcher is healthy cached prompts skip per-request revalidation and edits apply within seconds
+# Runs as the service account (share the prompt docs with its client_email); docs it cannot read, or all docs
+# without one, keep the cache's own revalidation
+PROMPT_WATCH_ENABLED = st.secrets.get("PROMPT_WATCH_ENABLED", True)
+PROMPT_WATCH_INTERVAL_SECONDS = float(st.secrets.get("PROMPT_WATCH_INTERVAL_SECONDS", 5))
+
+# Developer mode "Load All Mocks": concurrent mock doc fetches / Drive writes
+MOCK_FIXTURE_WORKERS = int(st.secrets.get("MOCK_FIXTURE_WORKERS", 6))
+
+# Warm the next workflow step in the background (its prompt docs and token counts) while the
+# current output is on screen; token counts are memoized per text (TOKEN_COUNT_CACHE_SIZE entries)
+STEP_WARMUP_ENABLED = st.secrets.get("STEP_WARMUP_ENABLED", True)
+TOKEN_COUNT_CACHE_SIZE = int(st.secrets.get("TOKEN_COUNT_CACHE_SIZE", 256))
+
 # Prompt Document IDs (Google Docs)
 meta_prompt = st.secrets.get("METAPROMPT_ID")
 
@@ -61,6 +143,11 @@ last_created_folder_name = st.secrets.get("LAST_CREATED_FOLDER_NAME", "LAST CREA
 # Google Sheets Data Logger
 lx_design_logger_sheet = st.secrets.get("LOGGING_SHEET_ID")
 
+# Context Selection (BM25 retrieval of relevant artifact chunks for PRD steps)
+CONTEXT_RETRIEVAL_ENABLED = st.secrets.get("CONTEXT_RETRIEVAL_ENABLED", True)
+CONTEXT_RETRIEVAL_TOP_K = int(st.secrets.get("CONTEXT_RETRIEVAL_TOP_K", 6))
+CONTEXT_CHUNK_CHARS = int(st.secrets.get("CONTEXT_CHUNK_CHARS", 1200))
+
 # Google Service Account
 google_type = st.secrets["GOOGLE_TYPE"]
 google_project_id = st.secrets["GOOGLE_PROJECT_ID"]
@@ -31,6 +31,14 @@ def main():
         st.session_state.session_folder_id = None
         st.session_state.session_log_sheet_id = None
     
+    # Load all prompt docs into the shared prompt cache in the background
+    from utils.google_docs_fetcher import start_prompt_prefetch
+    start_prompt_prefetch()
+    
+    # Follow Drive changes so prompt edits reach the prompt cache without per-request checks
+    from utils.prompt_watcher import start_prompt_watcher
+    start_prompt_watcher()
+    
     # Create session folder in OUTPUTS automatically
     if not st.session_state.session_folder_id:
         folder_id = create_session_folder(st.session_state.session_id)
@@ -286,6 +294,18 @@ def render_sidebar():
                     st.write(f"**Steps Completed:** {token_summary['steps_completed']}")
                     st.write(f"**Avg Tokens/Step:** {token_summary['avg_tokens_per_step']:.0f}")
                     st.write(f"**Avg Cost/Step:** ${token_summary['avg_cost_per_step']:.4f}")
+
+                    if token_summary.get('agent_runs', 0) > 0:
+                        st.write(f"**Agent Runs:** {token_summary['agent_runs']} "
+                                 f"({token_summary['agent_tool_calls']} tool calls, "
+                                 f"{token_summary['agent_searches']} searches)")
+                        st.write(f"**Agent Wall Time:** {token_summary['agent_wall_time_seconds']:.1f}s")
+
+                    from AI.context_retriever import get_context_savings_summary
+                    savings = get_context_savings_summary()
+                    if savings['steps']:
+                        st.write(f"**Context Tokens Saved:** {savings['tokens_saved']:,} "
+                                 f"({savings['percent_saved']:.0f}% over {savings['steps']} step(s))")
             else:
                 st.info("No AI calls yet this session")
         except ImportError as e:
@@ -312,6 +332,18 @@ def render_sidebar():
             if st.button("🔍 View Session Data", use_container_width=True):
                 st.session_state.show_debug = not st.session_state.get('show_debug', False)
             
+            # Fill every stage before the PRD with mock outputs in one go
+            save_mocks_to_drive = st.checkbox("Save mock docs to Drive", value=False)
+            if st.button("🎭 Load All Mocks", use_container_width=True):
+                from utils.mock_fixtures import load_all_mocks
+                with st.spinner("Loading mock data..."):
+                    success, message = load_all_mocks(save_to_drive=save_mocks_to_drive)
+                if success:
+                    st.success(message)
+                    st.rerun()
+                else:
+                    st.error(message)
+            
             # Simple debug info (always visible when dev mode is on)
             st.markdown("#### Debug Info")
             st.write(f"Session ID: {st.session_state.get('session_id', 'None')}")
@@ -322,7 +354,43 @@ def render_sidebar():
                 st.write(f"Sheet ID: {lx_design_logger_sheet}")
             except Exception as e:
                 st.write(f"Sheet ID Error: {e}")
-                
+
+            try:
+                from AI.search_cache import get_search_cache
+                cache_stats = get_search_cache().stats()
+                st.write(
+                    f"Search Cache: {cache_stats['entries']} entries, "
+                    f"{cache_stats['hits']} hits / {cache_stats['misses']} misses"
+                )
+            except Exception as e:
+                st.write(f"Search Cache Error: {e}")
+
+            try:
+                from utils.prompt_cache import get_prompt_cache
+                prompt_stats = get_prompt_cache().stats()
+                st.write(
+                    f"Prompt Cache: {prompt_stats['documents']} docs, {prompt_stats['hits']} hits, "
+                    f"{prompt_stats['revalidations']} revalidated, {prompt_stats['downloads']} downloads"
+                )
+            except Exception as e:
+                st.write(f"Prompt Cache Error: {e}")
+
+            try:
+                from utils.prompt_watcher import get_prompt_watcher
+                watcher = get_prompt_watcher()
+                if watcher:
+                    watcher_stats = watcher.stats()
+                    state = "healthy" if watcher_stats['healthy'] else f"unhealthy ({watcher_stats['last_error']})"
+                    st.write(
+                        f"Prompt Watcher: {state}, {watcher_stats['watched']}/{watcher_stats['documents']} docs watched, "
+                        f"{watcher_stats['polls']} polls, {watcher_stats['invalidations']} invalidations"
+                    )
+            except Exception as e:
+                st.write(f"Prompt Watcher Error: {e}")
+
+            if 'citation_registry' in st.session_state:
+                st.write(f"Citations: {st.session_state.citation_registry.stats()['citations']} unique sources")
+
             # Very simple test
             if st.button("🧪 Simple Test"):
                 st.success("Button clicked successfully!")
@@ -351,6 +419,21 @@ def render_main_content():
     if st.session_state.get('developer_mode', False) and st.session_state.get('show_debug', False):
         with st.expander("Debug Info", expanded=True):
             st.json(st.session_state.session_data)
+
+        token_tracker = st.session_state.get('token_tracker')
+        if token_tracker and token_tracker.agent_runs:
+            with st.expander("Research Agent Runs (metrics)", expanded=False):
+                for run in token_tracker.agent_runs:
+                    st.markdown(
+                        f"**{run['step_name']}** ({run.get('method', 'agent')}, {run['model_name']}): {run['iterations']} iterations, "
+                        f"{run['tool_calls']} tool calls, {run['searches']} searches "
+                        f"({run['suppressed_searches']} reused), {run['wall_time_seconds']:.1f}s wall time"
+                    )
+                    st.json(run, expanded=False)
+
+        if st.session_state.get('context_selection_log'):
+            with st.expander("Context Selection (tokens per step)", expanded=False):
+                st.json(st.session_state.context_selection_log)
     
     # Route to appropriate module based on current step
     if st.session_state.current_step == 1:
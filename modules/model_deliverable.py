@@ -49,7 +49,7 @@ def step_model_research(model_data):
         with col1:
             if st.button("🎭 Load Mock Model Research", use_container_width=True):
                 success, mock_content, method, doc_id = load_mock_research(
-                    'model_research',
+                    'model_deliverable_research',
                     topic,
                     st.session_state.session_folder_id,
                     st.session_state.session_id,
@@ -2,10 +2,14 @@ import streamlit as st
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from google.oauth2.service_account import Credentials as ServiceAccountCredentials
 from keys.config import (
     google_auth_client_id,
     google_auth_client_secret,
-    google_auth_redirect_uri
+    google_auth_redirect_uri,
+    google_type, google_project_id, google_private_key_id, google_private_key,
+    google_client_email, google_client_id, google_auth_uri, google_token_uri,
+    google_auth_provider_x509_cert_url, google_client_x509_cert_url, google_universe_domain
 )
 
 # OAuth Configuration
@@ -83,6 +87,23 @@ def authenticate_user():
     
     return True
 
+def get_service_account_credentials(scopes):
+    """Service account credentials from config (for headless jobs without a user login)."""
+    service_account_info = {
+        "type": google_type,
+        "project_id": google_project_id,
+        "private_key_id": google_private_key_id,
+        "private_key": google_private_key.replace('\\n', '\n') if google_private_key else "",
+        "client_email": google_client_email,
+        "client_id": google_client_id,
+        "auth_uri": google_auth_uri,
+        "token_uri": google_token_uri,
+        "auth_provider_x509_cert_url": google_auth_provider_x509_cert_url,
+        "client_x509_cert_url": google_client_x509_cert_url,
+        "universe_domain": google_universe_domain
+    }
+    return ServiceAccountCredentials.from_service_account_info(service_account_info, scopes=scopes)
+
 def get_user_credentials():
     """Get the user's credentials from session state."""
     return st.session_state.get('credentials', None)
@@ -1,5 +1,15 @@
-from .google_auth import get_docs_service
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from googleapiclient.discovery import build
+
+from .google_auth import get_docs_service, get_drive_service, get_user_credentials
+from .prompt_bundle import KIND_MOCK, KIND_PROMPT, get_bundled_content
+from .prompt_cache import get_prompt_cache
 from keys.config import (
+    PROMPT_SOURCE, PROMPT_FETCH_METHOD, PROMPT_CACHE_ENABLED, PROMPT_PREFETCH_ENABLED, PROMPT_PREFETCH_WORKERS,
     meta_prompt, topic_researcher, client_transcript, client_information,
     model_deliverable_researcher, model_deliverable_generation, 
     prd_meta_prompt, prd_executive_summary, prd_problem_statement, prd_goals_and_success_metrics,
@@ -9,72 +19,243 @@ from keys.config import (
     mock_model_deliverable_research, mock_model_deliverable, mock_prd
 )
 
-def get_document_content(document_id):
-    """Fetch content from a Google Doc"""
-    docs_service = get_docs_service()
+# Prompt type -> Google Doc id
+PROMPT_DOCUMENT_IDS = {
+    'meta_prompt': meta_prompt,
+    'topic_researcher': topic_researcher,
+    'client_transcript': client_transcript,
+    'client_information': client_information,
+    'model_deliverable_researcher': model_deliverable_researcher,
+    'model_deliverable_generation': model_deliverable_generation,
+    'prd_meta_prompt': prd_meta_prompt,
+    'prd_executive_summary': prd_executive_summary,
+    'prd_problem_statement': prd_problem_statement,
+    'prd_goals_and_success_metrics': prd_goals_and_success_metrics,
+    'prd_roles_and_responsibilities': prd_roles_and_responsibilities,
+    'prd_constraints_and_assumptions': prd_constraints_and_assumptions,
+    'prd_evaluation_criteria': prd_evaluation_criteria,
+    'prd_risk_and_mitigations': prd_risk_and_mitigations,
+    'prd_generator': prd_generator
+}
+
+# Mock type -> Google Doc id
+MOCK_DOCUMENT_IDS = {
+    'topic': mock_topic,
+    'topic_research': mock_topic_research,
+    'client_transcript': mock_client_transcript,
+    'client_information': mock_client_information,
+    'model_deliverable_research': mock_model_deliverable_research,
+    'model_deliverable': mock_model_deliverable,
+    'prd': mock_prd
+}
+
+def _paragraph_text(paragraph):
+    """Text of one paragraph; list items get a '- ' marker indented by nesting level"""
+    parts = []
+    for element in paragraph.get('elements', []):
+        if 'textRun' in element:
+            parts.append(element['textRun'].get('content', ''))
+        elif 'richLink' in element:
+            properties = element['richLink'].get('richLinkProperties', {})
+            parts.append(properties.get('title') or properties.get('uri', ''))
+        elif 'person' in element:
+            properties = element['person'].get('personProperties', {})
+            parts.append(properties.get('name') or properties.get('email', ''))
+    
+    text = ''.join(parts)
+    bullet = paragraph.get('bullet')
+    if bullet is not None and text.strip():
+        text = '  ' * bullet.get('nestingLevel', 0) + '- ' + text
+    return text
+
+def _collect_table(table, parts):
+    """Render a table as a markdown table; cell line breaks become <br>"""
+    parts.append('\n')
+    for row_index, row in enumerate(table.get('tableRows', [])):
+        cells = []
+        for cell in row.get('tableCells', []):
+            cell_parts = []
+            _collect_elements(cell.get('content', []), cell_parts)
+            cells.append(''.join(cell_parts).strip().replace('\n', '<br>'))
+        parts.append('| ' + ' | '.join(cells) + ' |\n')
+        if row_index == 0:
+            parts.append('|' + ' --- |' * len(cells) + '\n')
+    parts.append('\n')
+
+def _collect_elements(elements, parts):
+    """Append the text of structural elements (paragraphs, tables, tables of contents) to parts"""
+    for element in elements:
+        if 'paragraph' in element:
+            parts.append(_paragraph_text(element['paragraph']))
+        elif 'table' in element:
+            _collect_table(element['table'], parts)
+        elif 'tableOfContents' in element:
+            _collect_elements(element['tableOfContents'].get('content', []), parts)
+
+def extract_document_text(document):
+    """
+    Extract the text of a Google Docs API document resource
+    
+    One pass over every structural element, including tables (nested tables and
+    lists inside cells) and tables of contents; pieces are joined once at the end.
+    """
+    parts = []
+    _collect_elements(document.get('body', {}).get('content', []), parts)
+    return ''.join(parts).strip()
+
+def get_document_content(document_id, docs_service=None):
+    """Fetch content from a Google Doc (docs_service defaults to the session user's)"""
+    docs_service = docs_service or get_docs_service()
     if not docs_service:
         return None
     
     try:
         document = docs_service.documents().get(documentId=document_id).execute()
-        content = ""
+        return extract_document_text(document)
         
-        # Extract text content from the document
-        for element in document.get('body', {}).get('content', []):
-            if 'paragraph' in element:
-                for text_run in element['paragraph'].get('elements', []):
-                    if 'textRun' in text_run:
-                        content += text_run['textRun'].get('content', '')
+    except Exception as e:
+        print(f"Error fetching document {document_id}: {e}")
+        return None
+
+def export_document_text(document_id, drive_service=None):
+    """Fetch a Google Doc's text through Drive's plain-text export (no structural JSON)"""
+    drive_service = drive_service or get_drive_service()
+    if not drive_service:
+        return None
+    
+    try:
+        data = drive_service.files().export(fileId=document_id, mimeType='text/plain').execute()
+        text = data.decode('utf-8') if isinstance(data, bytes) else data
+        # The export starts with a byte order mark and uses CRLF line endings
+        return text.lstrip('\ufeff').replace('\r\n', '\n').strip()
         
-        return content.strip()
+    except Exception as e:
+        print(f"Error exporting document {document_id}: {e}")
+        return None
+
+def fetch_document_text(document_id, method=None, docs_service=None, drive_service=None):
+    """
+    Fetch a Google Doc's text with the given method
+    
+    Args:
+        method: "docs" (Docs API structural walk) or "export" (Drive plain-text export);
+            defaults to PROMPT_FETCH_METHOD
+    """
+    if (method or PROMPT_FETCH_METHOD) == "export":
+        return export_document_text(document_id, drive_service)
+    return get_document_content(document_id, docs_service)
+
+def get_document_revision(document_id, drive_service=None):
+    """Get a Google Doc's modifiedTime and version from Drive (a small metadata-only request)"""
+    drive_service = drive_service or get_drive_service()
+    if not drive_service:
+        return None
+    
+    try:
+        return drive_service.files().get(
+            fileId=document_id,
+            fields='modifiedTime,version',
+            supportsAllDrives=True
+        ).execute()
         
     except Exception as e:
-        print(f"Error fetching document {document_id}: {e}")
+        print(f"Error fetching revision of document {document_id}: {e}")
         return None
 
-def get_prompt_content(prompt_type):
-    """Get prompt content based on prompt type"""
-    prompt_map = {
-        'meta_prompt': meta_prompt,
-        'topic_researcher': topic_researcher,
-        'client_transcript': client_transcript,
-        'client_information': client_information,
-        'model_deliverable_researcher': model_deliverable_researcher,
-        'model_deliverable_generation': model_deliverable_generation,
-        'prd_meta_prompt': prd_meta_prompt,
-        'prd_executive_summary': prd_executive_summary,
-        'prd_problem_statement': prd_problem_statement,
-        'prd_goals_and_success_metrics': prd_goals_and_success_metrics,
-        'prd_roles_and_responsibilities': prd_roles_and_responsibilities,
-        'prd_constraints_and_assumptions': prd_constraints_and_assumptions,
-        'prd_evaluation_criteria': prd_evaluation_criteria,
-        'prd_risk_and_mitigations': prd_risk_and_mitigations,
-        'prd_generator': prd_generator
-    }
+def get_prompt_content(prompt_type, method=None):
+    """
+    Get prompt content based on prompt type (from the prompt bundle or the shared prompt cache)
     
-    document_id = prompt_map.get(prompt_type)
+    method selects the Google Docs fetch path ("docs" or "export", default PROMPT_FETCH_METHOD)
+    """
+    document_id = PROMPT_DOCUMENT_IDS.get(prompt_type)
     if not document_id:
         return f"Prompt type '{prompt_type}' not found"
     
-    return get_document_content(document_id)
-
-def get_mock_content(mock_type):
-    """Get mock data content based on mock type"""
-    mock_map = {
-        'topic': mock_topic,
-        'topic_research': mock_topic_research,
-        'client_transcript': mock_client_transcript,
-        'client_information': mock_client_information,
-        'model_deliverable_research': mock_model_deliverable_research,
-        'model_deliverable': mock_model_deliverable,
-        'prd': mock_prd
+    if PROMPT_SOURCE == "bundle":
+        return get_bundled_content(KIND_PROMPT, prompt_type)
+    method = method or PROMPT_FETCH_METHOD
+    if PROMPT_CACHE_ENABLED:
+        return get_prompt_cache().get(
+            document_id,
+            get_document_revision,
+            lambda doc_id: fetch_document_text(doc_id, method),
+            variant=method
+        )
+    return fetch_document_text(document_id, method)
+
+def prefetch_prompts(credentials, prompt_types=None, max_workers=PROMPT_PREFETCH_WORKERS, method=None):
+    """
+    Load prompt documents into the shared prompt cache concurrently
+    
+    Runs without Streamlit session state (e.g. on a background thread): each
+    worker builds its own Docs/Drive services from the given credentials, since
+    googleapiclient services are not thread-safe.
+    
+    Returns:
+        {prompt_type: prompt text, or None if it could not be loaded}
+    """
+    document_ids = {
+        prompt_type: PROMPT_DOCUMENT_IDS.get(prompt_type)
+        for prompt_type in (prompt_types or PROMPT_DOCUMENT_IDS)
+        if PROMPT_DOCUMENT_IDS.get(prompt_type)
     }
+    unique_ids = list(dict.fromkeys(document_ids.values()))
+    if not unique_ids:
+        return {}
+    method = method or PROMPT_FETCH_METHOD
+    
+    thread_services = threading.local()
     
-    document_id = mock_map.get(mock_type)
+    def load(document_id):
+        if not hasattr(thread_services, 'docs'):
+            thread_services.docs = build('docs', 'v1', credentials=credentials)
+            thread_services.drive = build('drive', 'v3', credentials=credentials)
+        return get_prompt_cache().get(
+            document_id,
+            lambda doc_id: get_document_revision(doc_id, thread_services.drive),
+            lambda doc_id: fetch_document_text(doc_id, method, thread_services.docs, thread_services.drive),
+            variant=method
+        )
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_ids)), thread_name_prefix="prompt-prefetch") as pool:
+        loaded = dict(zip(unique_ids, pool.map(load, unique_ids)))
+    
+    return {prompt_type: loaded[document_id] for prompt_type, document_id in document_ids.items()}
+
+def _run_prompt_prefetch(credentials, prompt_types=None):
+    started_at = time.monotonic()
+    try:
+        loaded = prefetch_prompts(credentials, prompt_types)
+        print(f"Prefetched {sum(content is not None for content in loaded.values())}/{len(loaded)} prompt docs in {time.monotonic() - started_at:.1f}s")
+    except Exception as e:
+        print(f"Error prefetching prompts: {e}")
+
+def start_prompt_prefetch():
+    """Prefetch every prompt document on a background thread, once per session"""
+    if PROMPT_SOURCE == "bundle" or not (PROMPT_CACHE_ENABLED and PROMPT_PREFETCH_ENABLED) \
+            or st.session_state.get('prompt_prefetch_started'):
+        return None
+    
+    # Credentials are read here: session state is not available on the worker threads
+    credentials = get_user_credentials()
+    if not credentials:
+        return None
+    
+    st.session_state.prompt_prefetch_started = True
+    thread = threading.Thread(target=_run_prompt_prefetch, args=(credentials,), name="prompt-prefetch", daemon=True)
+    thread.start()
+    return thread
+
+def get_mock_content(mock_type, method=None):
+    """Get mock data content based on mock type (method: "docs" or "export", default PROMPT_FETCH_METHOD)"""
+    document_id = MOCK_DOCUMENT_IDS.get(mock_type)
     if not document_id:
         return f"Mock type '{mock_type}' not found"
     
-    return get_document_content(document_id)
+    if PROMPT_SOURCE == "bundle":
+        return get_bundled_content(KIND_MOCK, mock_type)
+    return fetch_document_text(document_id, method)
 
 def update_document_content(document_id, new_content):
     """Update the content of a Google Doc"""
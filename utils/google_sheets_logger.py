@@ -1,38 +1,16 @@
-from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 import datetime
 import streamlit as st
-from keys.config import (
-    google_type, google_project_id, google_private_key_id, google_private_key,
-    google_client_email, google_client_id, google_auth_uri, google_token_uri,
-    google_auth_provider_x509_cert_url, google_client_x509_cert_url, google_universe_domain, lx_design_logger_sheet
-)
+from .google_auth import get_service_account_credentials
+from keys.config import google_private_key, google_client_email, lx_design_logger_sheet
 
 def get_service_account_sheets_service():
     """Get Google Sheets service using service account credentials"""
     try:
-        # Build service account info from config - properly handle private key
-        service_account_info = {
-            "type": google_type,
-            "project_id": google_project_id,
-            "private_key_id": google_private_key_id,
-            "private_key": google_private_key.replace('\\n', '\n') if google_private_key else "",
-            "client_email": google_client_email,
-            "client_id": google_client_id,
-            "auth_uri": google_auth_uri,
-            "token_uri": google_token_uri,
-            "auth_provider_x509_cert_url": google_auth_provider_x509_cert_url,
-            "client_x509_cert_url": google_client_x509_cert_url,
-            "universe_domain": google_universe_domain
-        }
-        
         print(f"Service account email: {google_client_email}")
         print(f"Private key starts with: {google_private_key[:50] if google_private_key else 'None'}...")
         
-        credentials = Credentials.from_service_account_info(
-            service_account_info,
-            scopes=['https://www.googleapis.com/auth/spreadsheets']
-        )
+        credentials = get_service_account_credentials(['https://www.googleapis.com/auth/spreadsheets'])
         
         return build('sheets', 'v4', credentials=credentials)
         
@@ -25,6 +25,10 @@ def render_research_input_options(topic, session_folder_id, session_id, step_nam
         unsafe_allow_html=True,
     )
     
+    # Load this step's and the next step's prompt docs and token counts in the background
+    from .step_warmup import start_step_warmup
+    start_step_warmup(prompt_type, context_data)
+    
     st.markdown("### ✍️ How would you like to provide the input?")
     mode = st.radio(
         "Choose a method:",
@@ -247,24 +251,38 @@ def handle_ai_generation(topic, session_folder_id, session_id, step_name, prompt
     
     # For research stages, give user a choice
     use_agent = False
+    use_pipeline = False
+    use_sonar = False
     if is_research_stage:
         st.markdown("### 🤖 Choose Generation Method")
         
         generation_method = st.radio(
             "How should AI generate content?",
             options=["Direct AI Generation (faster, uses training data)", 
+                     "Quick Research Pipeline (plan, search in parallel, write)",
                      "Deep Research Agent (Coming Soon)"],
             help=(
                 "**Direct AI:** Fast (~10 sec), uses LLM training data only\n\n"
+                "**Research Pipeline:** Medium (~20 sec), plans searches up front, runs them all at once, "
+                "then writes one cited output\n\n"
                 "**AI Agent:** Slower (~60 sec), searches web for current info, includes citations"
             ),
             key=f"generation_method_{step_name}"
         )
         
         use_agent = "Agent" in generation_method
+        use_pipeline = "Pipeline" in generation_method
+        
+        # Sonar models search the web themselves: one direct call instead of agent/pipeline searches
+        from AI.sonar_research import is_sonar_model
+        use_sonar = (use_agent or use_pipeline) and is_sonar_model(st.session_state.get('selected_ai_model', 'gpt-5'))
         
-        if use_agent:
+        if use_sonar:
+            st.info("🔍 Perplexity Sonar searches the web itself - research runs as one direct call with citations")
+        elif use_agent:
             st.info("🔍 Agent will search the web multiple times and synthesize findings with citations")
+        elif use_pipeline:
+            st.info("🔍 Pipeline will plan its searches, run them in parallel and write the output with citations")
         else:
             st.info("⚡ Direct AI generation - fast and efficient")
     else:
@@ -284,7 +302,7 @@ def handle_ai_generation(topic, session_folder_id, session_id, step_name, prompt
         # Show processing state instead of button
         st.info("🧠 AI is generating content... Please wait.")
         
-        with st.spinner("🧠 Generating content..." if not use_agent else "🔍 AI is researching with search tools..."):
+        with st.spinner("🧠 Generating content..." if not (use_agent or use_pipeline) else "🔍 AI is researching with search tools..."):
             try:
                 # Get the meta prompt and module prompt from Google Docs
                 from utils.google_docs_fetcher import get_prompt_content
@@ -312,26 +330,72 @@ def handle_ai_generation(topic, session_folder_id, session_id, step_name, prompt
                 # Prepare context
                 if not context_data:
                     context_data = {'topic': topic}
-                
+
+                # PRD steps only need the relevant parts of earlier artifacts:
+                # swap full documents for their top-k BM25 chunks
+                from keys.config import CONTEXT_RETRIEVAL_ENABLED
+                if prompt_type.startswith('prd_') and CONTEXT_RETRIEVAL_ENABLED:
+                    from AI.context_retriever import update_context_index, select_context
+                    update_context_index(st.session_state.get('session_data', {}))
+                    context_data, selection_stats = select_context(
+                        context_data,
+                        query=f"{topic}\n\n{module_prompt}",
+                        step_name=step_name
+                    )
+                    print(f"Context selection for {step_name}: {selection_stats['full_context_tokens']} -> "
+                          f"{selection_stats['selected_context_tokens']} tokens")
+
                 # Choose generation method: Agent for research stages, direct LLM for others
-                if use_agent:
+                if use_sonar:
+                    # Sonar already searches: one round trip, citations come back with the answer
+                    from AI.sonar_research import run_sonar_research
+                    model_name = st.session_state.get('selected_ai_model', 'gpt-5')
+                    
+                    with st.status("🔍 Sonar research is starting...", expanded=True) as sonar_status:
+                        research = run_sonar_research(
+                            combined_prompt=combined_prompt,
+                            context=context_data,
+                            model_name=model_name,
+                            step_name=step_name,
+                            status=sonar_status
+                        )
+                elif use_agent:
                     # Use research agent with search capabilities
                     from AI.research_agent import run_research_agent
                     model_name = st.session_state.get('selected_ai_model', 'gpt-5')
                     
-                    research = run_research_agent(
-                        combined_prompt=combined_prompt,
-                        context=context_data,
-                        model_name=model_name,
-                        step_name=step_name
-                    )
+                    # Live Thought/Action/Observation summaries while the agent runs
+                    with st.status("🔍 Research agent is starting...", expanded=True) as agent_status:
+                        research = run_research_agent(
+                            combined_prompt=combined_prompt,
+                            context=context_data,
+                            model_name=model_name,
+                            step_name=step_name,
+                            status=agent_status
+                        )
+                elif use_pipeline:
+                    # Plan -> concurrent searches -> synthesis (three round trips)
+                    from AI.research_pipeline import run_research_pipeline
+                    model_name = st.session_state.get('selected_ai_model', 'gpt-5')
+                    
+                    with st.status("🔍 Research pipeline is starting...", expanded=True) as pipeline_status:
+                        research = run_research_pipeline(
+                            combined_prompt=combined_prompt,
+                            context=context_data,
+                            model_name=model_name,
+                            step_name=step_name,
+                            status=pipeline_status
+                        )
                 else:
                     # Use direct LLM generation (existing behavior)
                     research = generate_ai_response(combined_prompt, context_data, step_name)
                 
                 if research:
                     # Create Google Doc with the research
-                    method_label = "Agent Research" if use_agent else "AI Generated"
+                    method_label = "Sonar Research" if use_sonar else "Agent Research" if use_agent else \
+                                   "Pipeline Research" if use_pipeline else "AI Generated"
+                    method = "sonar_research" if use_sonar else "agent_research" if use_agent else \
+                             "pipeline_research" if use_pipeline else "ai_generated"
                     doc_title = f"{step_name.title()} - {topic} ({method_label})"
                     doc_content = research
                     
@@ -346,19 +410,29 @@ def handle_ai_generation(topic, session_folder_id, session_id, step_name, prompt
                         f'{step_name}_research_completed',
                         {
                             'topic': topic,
-                            'method': 'agent_research' if use_agent else 'ai_generated',
+                            'method': method,
                             'prompt_type': prompt_type,
                             'doc_id': doc_id,
                             'content_length': len(research),
-                            'used_agent': use_agent
+                            'used_agent': use_agent and not use_sonar,
+                            'used_pipeline': use_pipeline and not use_sonar,
+                            'used_sonar': use_sonar
                         }
                     )
                     
+                    # Research outputs become searchable by later agent runs (local search tool)
+                    if is_research_stage:
+                        from AI.artifact_index import index_research_output
+                        index_research_output(step_name, topic, research, session_id)
+                    
                     # Clear processing state on success
                     st.session_state[ai_processing_key] = False
-                    success_msg = "✅ Agent research completed and saved!" if use_agent else "✅ AI research generated and saved!"
+                    success_msg = "✅ Sonar research completed and saved!" if use_sonar else \
+                                  "✅ Agent research completed and saved!" if use_agent else \
+                                  "✅ Pipeline research completed and saved!" if use_pipeline else \
+                                  "✅ AI research generated and saved!"
                     st.success(success_msg)
-                    return True, research, f'{"agent_research" if use_agent else "ai_generated"}:{prompt_type}', doc_id
+                    return True, research, f'{method}:{prompt_type}', doc_id
                 else:
                     # Clear processing state on failure
                     st.session_state[ai_processing_key] = False
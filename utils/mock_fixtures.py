@@ -0,0 +1,167 @@
+"""
+Mock Fixture Pack
+Loads every workflow stage's mock output in one action for developer mode /
+QA, instead of one "Load Mock ..." click (a Docs fetch plus Drive writes) per
+step. Mocks come from the local prompt bundle snapshot when it holds them
+(`python -m utils.prompt_bundle sync`), otherwise from Google Docs with all
+mock docs fetched concurrently. Saving the mocks as Drive docs is optional and
+runs in parallel.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from googleapiclient.discovery import build
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from .google_auth import get_user_credentials
+from .google_docs_fetcher import MOCK_DOCUMENT_IDS, fetch_document_text
+from .google_drive_manager import create_google_doc
+from .google_sheets_logger import log_session_data
+from .prompt_bundle import KIND_MOCK, get_prompt_bundle
+from keys.config import MOCK_FIXTURE_WORKERS, PROMPT_BUNDLE_PATH
+
+# Stages filled by the fixture pack, in workflow order:
+# (session_data key, output field prefix, mock type, step name)
+MOCK_STAGES = [
+    ('topic_research_data', 'research', 'topic_research', 'topic'),
+    ('client_conversation_data', 'transcript', 'client_transcript', 'client_transcript'),
+    ('client_conversation_data', 'info', 'client_information', 'client_info'),
+    ('model_deliverable_data', 'research', 'model_deliverable_research', 'model_research'),
+    ('model_deliverable_data', 'deliverable', 'model_deliverable', 'model_deliverable'),
+]
+
+# Where each stage's module resumes once its outputs are loaded
+STAGE_SUBSTEPS = {
+    'topic_research_data': 'research_options',
+    'client_conversation_data': 'client_info',
+    'model_deliverable_data': 'model_deliverable',
+}
+
+# The fixture pack covers every stage before the PRD
+FIXTURE_STEP = 4
+
+
+def fetch_mock_fixtures(mock_types, credentials=None, max_workers=MOCK_FIXTURE_WORKERS):
+    """
+    Mock contents by type: from the prompt bundle when it holds them, else from Google Docs concurrently
+
+    Returns:
+        {mock_type: content or None}
+    """
+    bundle = get_prompt_bundle() if os.path.exists(PROMPT_BUNDLE_PATH) else None
+    fixtures = {}
+    if bundle is not None:
+        for mock_type in mock_types:
+            try:
+                fixtures[mock_type] = bundle.get(KIND_MOCK, mock_type)
+            except ValueError as e:
+                print(f"Error reading mock '{mock_type}' from the prompt bundle: {e}")
+                fixtures[mock_type] = None
+
+    missing = [mock_type for mock_type in mock_types
+               if fixtures.get(mock_type) is None and MOCK_DOCUMENT_IDS.get(mock_type)]
+    if missing and credentials:
+        thread_services = threading.local()
+
+        def load(mock_type):
+            # googleapiclient services are not thread-safe: one per worker
+            if not hasattr(thread_services, 'docs'):
+                thread_services.docs = build('docs', 'v1', credentials=credentials)
+                thread_services.drive = build('drive', 'v3', credentials=credentials)
+            return fetch_document_text(MOCK_DOCUMENT_IDS[mock_type], None, thread_services.docs, thread_services.drive)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing)), thread_name_prefix="mock-fetch") as pool:
+            fixtures.update(zip(missing, pool.map(load, missing)))
+
+    return fixtures
+
+
+def save_mock_docs(documents, session_folder_id, max_workers=MOCK_FIXTURE_WORKERS):
+    """
+    Create the mock Google Docs in parallel
+
+    Args:
+        documents: {step_name: (title, content)}
+
+    Returns:
+        {step_name: doc_id or None}
+    """
+    if not documents:
+        return {}
+
+    # create_google_doc reads the user's credentials from session state: attach this script run to the workers
+    ctx = get_script_run_ctx()
+
+    def attach_context():
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    def save(step_name):
+        title, content = documents[step_name]
+        try:
+            return create_google_doc(title, content, session_folder_id)
+        except Exception as e:
+            print(f"Error saving mock doc {title}: {e}")
+            return None
+
+    step_names = list(documents)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(step_names)), thread_name_prefix="mock-save",
+                            initializer=attach_context) as pool:
+        return dict(zip(step_names, pool.map(save, step_names)))
+
+
+def load_all_mocks(save_to_drive=False):
+    """
+    Fill every stage's session_data with mock outputs and jump to the PRD step
+
+    Returns:
+        (success, message)
+    """
+    started_at = time.monotonic()
+    mock_types = ['topic'] + [mock_type for _, _, mock_type, _ in MOCK_STAGES]
+    fixtures = fetch_mock_fixtures(mock_types, get_user_credentials())
+
+    missing = [mock_type for mock_type in mock_types if not fixtures.get(mock_type)]
+    if missing:
+        return False, f"Could not load mocks: {', '.join(missing)}"
+
+    topic = fixtures['topic'].strip()
+    doc_ids = {}
+    if save_to_drive:
+        doc_ids = save_mock_docs(
+            {
+                step_name: (f"{step_name.title()} Research - {topic} (Mock Data)", fixtures[mock_type])
+                for _, _, mock_type, step_name in MOCK_STAGES
+            },
+            st.session_state.session_folder_id
+        )
+
+    session_data = st.session_state.session_data
+    for data_key, substep in STAGE_SUBSTEPS.items():
+        session_data[data_key] = {'current_substep': substep}
+    session_data['topic_research_data'].update({'user_topic': topic, 'welcome_shown': True})
+
+    for data_key, prefix, mock_type, step_name in MOCK_STAGES:
+        session_data[data_key].update({
+            f'{prefix}_output': fixtures[mock_type],
+            f'{prefix}_method_used': f'mock_data:{mock_type}',
+            f'{prefix}_doc_id': doc_ids.get(step_name),
+        })
+
+    st.session_state.current_step = FIXTURE_STEP
+
+    elapsed = time.monotonic() - started_at
+    log_session_data(
+        st.session_state.session_id,
+        'mock_fixtures_loaded',
+        {
+            'topic': topic,
+            'stages': [step_name for _, _, _, step_name in MOCK_STAGES],
+            'saved_to_drive': save_to_drive,
+            'seconds': round(elapsed, 2)
+        }
+    )
+    return True, f"Loaded {len(MOCK_STAGES)} mock outputs in {elapsed:.1f}s"
@@ -0,0 +1,358 @@
+"""
+Prompt Bundle
+Versioned, content-hashed snapshot of every prompt and mock Google Doc in one
+memory-mappable file. With PROMPT_SOURCE = "bundle" prompts and mocks are read
+from the bundle instead of Google Docs, so the hot path makes no Docs calls and
+pipelines can run headless or offline. Google Docs stay the source of truth:
+the bundle is only written by the sync command.
+
+    python -m utils.prompt_bundle sync    # snapshot all docs (service account credentials)
+    python -m utils.prompt_bundle info    # show what the bundle holds
+
+The service account must have read access to the prompt and mock docs.
+
+File layout:
+    MAGIC (8 bytes) | header length (8 bytes, little endian) | JSON header | UTF-8 documents
+The header maps "prompt:<type>" / "mock:<type>" to the offset, length and
+sha256 of each document in the data section; the bundle hash covers every
+entry, and the bundle version increases on each sync that changes content.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from keys.config import PROMPT_BUNDLE_PATH
+
+
+MAGIC = b"LXPBNDL1"
+FORMAT_VERSION = 1
+HEADER_LENGTH = struct.Struct("<Q")
+
+KIND_PROMPT = "prompt"
+KIND_MOCK = "mock"
+
+SYNC_SCOPES = [
+    'https://www.googleapis.com/auth/documents.readonly',
+    'https://www.googleapis.com/auth/drive.readonly'
+]
+
+
+def entry_name(kind: str, name: str) -> str:
+    return f"{kind}:{name}"
+
+
+def bundle_hash(entries: Dict[str, Dict[str, Any]]) -> str:
+    """Hash of every entry name and content hash (independent of sync time and layout)"""
+    digest = hashlib.sha256()
+    for name in sorted(entries):
+        digest.update(f"{name}\t{entries[name]['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_bundle(documents: Dict[str, Dict[str, Any]], version: int) -> bytes:
+    """
+    Serialize documents into bundle bytes
+
+    Args:
+        documents: entry name -> {'content', 'document_id', 'modified_time', 'doc_version'}
+        version: Bundle version to record
+
+    Returns:
+        Bundle file contents
+    """
+    entries = {}
+    data = bytearray()
+    for name in sorted(documents):
+        document = documents[name]
+        encoded = document["content"].encode("utf-8")
+        entries[name] = {
+            "offset": len(data),
+            "length": len(encoded),
+            "sha256": hashlib.sha256(encoded).hexdigest(),
+            "document_id": document.get("document_id"),
+            "modified_time": document.get("modified_time"),
+            "doc_version": document.get("doc_version"),
+        }
+        data.extend(encoded)
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "version": version,
+        "bundle_hash": bundle_hash(entries),
+        "created_at": datetime.now().isoformat(),
+        "entries": entries,
+    }).encode("utf-8")
+
+    return MAGIC + HEADER_LENGTH.pack(len(header)) + header + bytes(data)
+
+
+class PromptBundle:
+    """Read-only, memory-mapped prompt bundle"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime_ns = os.stat(path).st_mtime_ns
+        self._verified = set()
+        self._lock = threading.Lock()  # a replaced bundle is closed while other sessions may be reading it
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a prompt bundle")
+        (header_length,) = HEADER_LENGTH.unpack_from(self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + HEADER_LENGTH.size
+        self.header = json.loads(self._mmap[header_start:header_start + header_length])
+        if self.header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported prompt bundle format {self.header.get('format')}")
+        self._data_start = header_start + header_length
+
+    @property
+    def version(self) -> int:
+        return self.header["version"]
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        return self.header["entries"]
+
+    def get(self, kind: str, name: str) -> Optional[str]:
+        """Document text, or None if the bundle does not hold it"""
+        key = entry_name(kind, name)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        start = self._data_start + entry["offset"]
+        with self._lock:
+            if self._mmap.closed:
+                raise ValueError(f"Prompt bundle {self.path} was closed (replaced by a newer sync)")
+            raw = self._mmap[start:start + entry["length"]]
+        if key not in self._verified:
+            if hashlib.sha256(raw).hexdigest() != entry["sha256"]:
+                raise ValueError(f"Prompt bundle entry {key} is corrupt (hash mismatch)")
+            self._verified.add(key)
+        return raw.decode("utf-8")
+
+    @property
+    def closed(self) -> bool:
+        return self._mmap.closed
+
+    def close(self):
+        with self._lock:
+            self._mmap.close()
+
+
+def read_bundle_header(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        bundle = PromptBundle(path)
+    except (OSError, ValueError):
+        return None
+    header = bundle.header
+    bundle.close()
+    return header
+
+
+def write_bundle(path: str, documents: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Write documents to a bundle file (atomically); unchanged content keeps the existing bundle
+
+    Returns:
+        {'version', 'bundle_hash', 'changed', 'entries'}
+    """
+    previous = read_bundle_header(path)
+    content_hash = bundle_hash({
+        name: {"sha256": hashlib.sha256(document["content"].encode("utf-8")).hexdigest()}
+        for name, document in documents.items()
+    })
+    if previous and previous.get("bundle_hash") == content_hash:
+        return {"version": previous["version"], "bundle_hash": content_hash, "changed": False,
+                "entries": len(previous["entries"])}
+
+    version = (previous or {}).get("version", 0) + 1
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(build_bundle(documents, version))
+    os.replace(temp_path, path)
+
+    return {"version": version, "bundle_hash": content_hash, "changed": True, "entries": len(documents)}
+
+
+def keep_previous_entries(path: str, documents: Dict[str, Dict[str, Any]], names: List[str]) -> List[str]:
+    """
+    Copy entries from the existing bundle into documents, so a failed fetch does not drop a synced doc
+
+    Returns:
+        Entry names that were kept
+    """
+    try:
+        previous = PromptBundle(path)
+    except (OSError, ValueError):
+        return []
+
+    kept = []
+    try:
+        for name in names:
+            entry = previous.entries.get(name)
+            if entry is None:
+                continue
+            kind, _, document_name = name.partition(":")
+            try:
+                content = previous.get(kind, document_name)
+            except ValueError as e:
+                print(f"Error reading {name} from the previous prompt bundle: {e}")
+                continue
+            documents[name] = {
+                "content": content,
+                "document_id": entry.get("document_id"),
+                "modified_time": entry.get("modified_time"),
+                "doc_version": entry.get("doc_version"),
+            }
+            kept.append(name)
+    finally:
+        previous.close()
+    return kept
+
+
+_bundle = None
+_bundle_lock = threading.Lock()
+
+
+def get_prompt_bundle(path: str = PROMPT_BUNDLE_PATH) -> Optional[PromptBundle]:
+    """Get the process-wide bundle, reopening it when a sync has replaced the file"""
+    global _bundle
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        print(f"Prompt bundle not found at {path}. Run: python -m utils.prompt_bundle sync")
+        return None
+
+    with _bundle_lock:
+        if _bundle is None or _bundle.path != path or _bundle.mtime_ns != mtime_ns:
+            try:
+                bundle = PromptBundle(path)
+            except (OSError, ValueError) as e:
+                print(f"Error opening prompt bundle {path}: {e}")
+                return None
+            # Release the replaced bundle's mapping (a reader holding it keeps its own str copies)
+            if _bundle is not None:
+                _bundle.close()
+            _bundle = bundle
+        return _bundle
+
+
+def get_bundled_content(kind: str, name: str) -> Optional[str]:
+    """Read a prompt or mock from the bundle (None if missing)"""
+    bundle = get_prompt_bundle()
+    if bundle is None:
+        return None
+    try:
+        content = bundle.get(kind, name)
+    except ValueError as e:
+        if not bundle.closed:
+            print(f"Error reading prompt bundle: {e}")
+            return None
+        # Replaced by a newer sync between lookup and read: read from the new bundle
+        return get_bundled_content(kind, name)
+    if content is None:
+        print(f"{kind.title()} '{name}' is not in the prompt bundle (version {bundle.version}). "
+              f"Run: python -m utils.prompt_bundle sync")
+    return content
+
+
+def sync(path: str = PROMPT_BUNDLE_PATH, method: Optional[str] = None) -> List[str]:
+    """
+    Snapshot every prompt and mock doc into the bundle
+
+    Args:
+        method: Google Docs fetch path, "docs" or "export" (default PROMPT_FETCH_METHOD)
+
+    Returns:
+        Entry names that could not be fetched (the previous bundle's copy is kept when it has one)
+    """
+    from googleapiclient.discovery import build
+    from utils.google_auth import get_service_account_credentials
+    from utils.google_docs_fetcher import (
+        MOCK_DOCUMENT_IDS, PROMPT_DOCUMENT_IDS, fetch_document_text, get_document_revision
+    )
+
+    credentials = get_service_account_credentials(SYNC_SCOPES)
+    docs_service = build('docs', 'v1', credentials=credentials)
+    drive_service = build('drive', 'v3', credentials=credentials)
+
+    sources = [(KIND_PROMPT, PROMPT_DOCUMENT_IDS), (KIND_MOCK, MOCK_DOCUMENT_IDS)]
+    documents = {}
+    failed = []
+    downloaded = {}  # document_id -> (content, revision); several types may share a doc
+    for kind, document_ids in sources:
+        for name, document_id in document_ids.items():
+            key = entry_name(kind, name)
+            if not document_id:
+                print(f"  skip   {key} (no document id configured)")
+                continue
+            if document_id not in downloaded:
+                downloaded[document_id] = (
+                    fetch_document_text(document_id, method, docs_service, drive_service),
+                    get_document_revision(document_id, drive_service) or {}
+                )
+            content, revision = downloaded[document_id]
+            if content is None:
+                print(f"  FAILED {key} ({document_id})")
+                failed.append(key)
+                continue
+            documents[key] = {
+                "content": content,
+                "document_id": document_id,
+                "modified_time": revision.get("modifiedTime"),
+                "doc_version": revision.get("version"),
+            }
+            print(f"  ok     {key} ({len(content):,} chars)")
+
+    for key in keep_previous_entries(path, documents, failed):
+        print(f"  kept   {key} (previous bundle copy)")
+
+    result = write_bundle(path, documents)
+    state = "written" if result["changed"] else "unchanged"
+    print(f"Prompt bundle {state}: {path} v{result['version']} ({result['entries']} docs, "
+          f"hash {result['bundle_hash'][:12]})")
+    return failed
+
+
+def info(path: str = PROMPT_BUNDLE_PATH):
+    """Print the bundle's version and entries"""
+    bundle = PromptBundle(path)
+    print(f"{path}: version {bundle.version}, created {bundle.header['created_at']}, "
+          f"hash {bundle.header['bundle_hash'][:12]}")
+    for name, entry in sorted(bundle.entries.items()):
+        print(f"  {name:<45}{entry['length']:>9,} bytes  modified {entry.get('modified_time') or '-'}")
+    bundle.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot prompt and mock Google Docs into a local bundle")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subcommands.add_parser("sync", help="Download every prompt and mock doc into the bundle")
+    sync_parser.add_argument("--path", default=PROMPT_BUNDLE_PATH)
+    sync_parser.add_argument("--method", choices=["docs", "export"], help="Google Docs fetch path")
+    info_parser = subcommands.add_parser("info", help="Show the bundle's version and contents")
+    info_parser.add_argument("--path", default=PROMPT_BUNDLE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        failed = sync(args.path, args.method)
+        sys.exit(1 if failed else 0)
+    info(args.path)
+
+
+if __name__ == "__main__":
+    main()
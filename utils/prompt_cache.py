@@ -0,0 +1,152 @@
+"""
+Prompt Document Cache
+Process-wide cache of prompt Google Doc text shared by every session. Cached
+text is revalidated with a small Drive files.get (modifiedTime + version) and
+the document is downloaded again only when it has actually changed. Text from
+different fetch paths (Docs API walk, Drive plain-text export) is cached
+separately, as a variant of the document. While a change feed (the Drive
+Changes watcher in utils.prompt_watcher) is healthy, cached text is served
+without per-request revalidation and the feed invalidates edited documents.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+
+from keys.config import PROMPT_CACHE_REVALIDATE_SECONDS
+
+
+class PromptCache:
+    """Document id -> text, validated against the Drive file's modifiedTime and version"""
+
+    def __init__(self, revalidate_seconds: float = PROMPT_CACHE_REVALIDATE_SECONDS):
+        self.revalidate_seconds = revalidate_seconds
+        self.hits = 0
+        self.revalidations = 0
+        self.downloads = 0
+        self.stale_served = 0
+
+        self._entries = {}  # (document_id, variant) -> {'content', 'modified_time', 'version', 'checked_at'}
+        self._invalidated_at = {}  # document_id (None: every document) -> monotonic time of the last invalidation
+        # Set by the prompt watcher: covers(checked_at, document_id) is True while it pushes every edit
+        # of that document as an invalidation
+        self.change_feed = None
+        self._document_locks = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _revision(metadata: Optional[Dict[str, Any]]) -> tuple:
+        metadata = metadata or {}
+        return metadata.get("modifiedTime"), metadata.get("version")
+
+    def _document_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            return self._document_locks.setdefault(key, threading.Lock())
+
+    def _fresh(self, key: tuple, entry: Optional[Dict[str, Any]]) -> bool:
+        if entry is None:
+            return False
+        # Stored by a fetch that started before an invalidation: check again
+        never = float("-inf")
+        if entry["checked_at"] <= max(self._invalidated_at.get(key[0], never), self._invalidated_at.get(None, never)):
+            return False
+        change_feed = self.change_feed
+        if change_feed is not None and change_feed.covers(entry["checked_at"], key[0]):
+            return True
+        return time.monotonic() - entry["checked_at"] < self.revalidate_seconds
+
+    def get(
+        self,
+        document_id: str,
+        fetch_metadata: Callable[[str], Optional[Dict[str, Any]]],
+        fetch_content: Callable[[str], Optional[str]],
+        variant: str = "docs"
+    ) -> Optional[str]:
+        """
+        Get a document's text, downloading it only if it is new or has changed
+
+        Args:
+            document_id: Google Doc id
+            fetch_metadata: Returns {'modifiedTime', 'version'} for a document (None on error)
+            fetch_content: Downloads a document's text (None on error)
+            variant: Fetch path the text comes from; each variant is cached separately
+
+        Returns:
+            Document text, or None if it could not be fetched. When Drive cannot
+            be reached the last cached text is served.
+        """
+        key = (document_id, variant)
+        entry = self._entries.get(key)
+        if self._fresh(key, entry):
+            self.hits += 1
+            return entry["content"]
+
+        # One validation/download per document at a time; concurrent callers wait for it
+        with self._document_lock(key):
+            entry = self._entries.get(key)
+            if self._fresh(key, entry):
+                self.hits += 1
+                return entry["content"]
+
+            # Checked as of before the metadata read, so an invalidation arriving mid-fetch is not lost
+            checked_at = time.monotonic()
+            metadata = fetch_metadata(document_id)
+            if entry is not None:
+                if metadata is None:
+                    self.stale_served += 1
+                    return entry["content"]
+                if self._revision(metadata) == (entry["modified_time"], entry["version"]):
+                    entry["checked_at"] = checked_at
+                    self.revalidations += 1
+                    return entry["content"]
+
+            # Metadata is read before the download, so an edit made mid-download is picked up next time
+            content = fetch_content(document_id)
+            if content is None:
+                if entry is not None:
+                    self.stale_served += 1
+                    return entry["content"]
+                return None
+
+            modified_time, version = self._revision(metadata)
+            self._entries[key] = {
+                "content": content,
+                "modified_time": modified_time,
+                "version": version,
+                "checked_at": checked_at
+            }
+            self.downloads += 1
+            return content
+
+    def invalidate(self, document_id: Optional[str] = None):
+        """Force the next get to revalidate one document, all variants (or every document)"""
+        with self._lock:
+            self._invalidated_at[document_id] = time.monotonic()
+            if document_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in list(self._entries) if key[0] == document_id]:
+                    self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len({document_id for document_id, _ in list(self._entries)}),
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "downloads": self.downloads,
+            "stale_served": self.stale_served,
+        }
+
+
+_prompt_cache = None
+_prompt_cache_lock = threading.Lock()
+
+
+def get_prompt_cache() -> PromptCache:
+    """Get the process-wide prompt cache (shared across sessions)"""
+    global _prompt_cache
+    if _prompt_cache is None:
+        with _prompt_cache_lock:
+            if _prompt_cache is None:
+                _prompt_cache = PromptCache()
+    return _prompt_cache
@@ -0,0 +1,213 @@
+"""
+Prompt Change Watcher
+Background thread that follows the Drive Changes API (changes.list from a
+stored page token) and invalidates edited prompt docs in the shared prompt
+cache. One cheap call per interval covers every prompt document; while the
+watcher is healthy the cache serves prompts without per-request freshness
+checks, and falls back to its own revalidation when the watcher is not.
+
+The watcher runs for the life of the process, so it uses the service account
+(like `python -m utils.prompt_bundle sync`), not a user's session credentials.
+The service account only sees changes to docs shared with it: share the
+prompt docs with its client_email. Docs it cannot read are not covered and
+keep their per-request revalidation.
+"""
+
+import threading
+import time
+from typing import Dict, Any, Iterable, Optional
+
+from googleapiclient.discovery import build
+
+from .google_auth import get_service_account_credentials
+from .prompt_cache import PromptCache, get_prompt_cache
+from keys.config import PROMPT_SOURCE, PROMPT_CACHE_ENABLED, PROMPT_WATCH_ENABLED, PROMPT_WATCH_INTERVAL_SECONDS
+
+
+CHANGE_FIELDS = "nextPageToken,newStartPageToken,changes(fileId,removed)"
+
+WATCH_SCOPES = ['https://www.googleapis.com/auth/drive.metadata.readonly']
+
+# Missed polls tolerated before the watcher counts as unhealthy
+HEALTHY_POLLS = 3
+
+MAX_BACKOFF_SECONDS = 300
+
+
+class PromptChangeWatcher:
+    """Follows Drive changes and pushes prompt doc invalidations into a PromptCache"""
+
+    def __init__(
+        self,
+        credentials,
+        document_ids: Iterable[str],
+        cache: PromptCache,
+        interval_seconds: float = PROMPT_WATCH_INTERVAL_SECONDS
+    ):
+        self.credentials = credentials
+        self.document_ids = set(filter(None, document_ids))
+        self.cache = cache
+        self.interval_seconds = interval_seconds
+        self.polls = 0
+        self.invalidations = 0
+        self.failures = 0
+        self.last_error = None
+
+        self._page_token = None
+        self._watched_ids = frozenset()  # documents the credentials can read; only these are covered
+        self._covered_since = None  # monotonic time the page token was taken; edits after it are reported
+        self._last_success = None
+        self._service = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def covers(self, checked_at: float, document_id: str) -> bool:
+        """True if every edit of the document made after checked_at has been or will be pushed as an invalidation"""
+        return document_id in self._watched_ids and self.is_healthy() and checked_at >= self._covered_since
+
+    def is_healthy(self) -> bool:
+        last_success = self._last_success
+        return (
+            last_success is not None
+            and self._thread is not None and self._thread.is_alive()
+            and time.monotonic() - last_success < self.interval_seconds * HEALTHY_POLLS
+        )
+
+    def _drive(self):
+        # Built on the watcher thread: googleapiclient services are not thread-safe
+        if self._service is None:
+            self._service = build('drive', 'v3', credentials=self.credentials)
+        return self._service
+
+    def _check_access(self):
+        """Find the prompt docs these credentials can read: changes to any other doc are never reported"""
+        watched_ids = set()
+        for document_id in self.document_ids:
+            try:
+                self._drive().files().get(fileId=document_id, fields="id", supportsAllDrives=True).execute()
+                watched_ids.add(document_id)
+            except Exception as e:
+                print(f"Prompt watcher cannot read {document_id}, leaving it to revision checks: {e}")
+        self._watched_ids = frozenset(watched_ids)
+        if not watched_ids:
+            # Fail closed and check again (with a new token) on the next poll
+            self._page_token = None
+            raise RuntimeError("prompt watcher credentials cannot read any prompt doc")
+
+    def _start_page_token(self):
+        # Uncovered until the new token is issued
+        self._watched_ids = frozenset()
+        response = self._drive().changes().getStartPageToken(supportsAllDrives=True).execute()
+        self._page_token = response["startPageToken"]
+        # Taken after the token: an edit made while it was being issued may not be reported
+        self._covered_since = time.monotonic()
+
+    def poll(self) -> int:
+        """
+        Read the changes since the stored page token and invalidate changed prompt docs
+
+        Returns:
+            Number of prompt docs invalidated
+        """
+        if self._page_token is None:
+            self._start_page_token()
+            self._check_access()
+
+        changed = set()
+        page_token = self._page_token
+        while page_token:
+            response = self._drive().changes().list(
+                pageToken=page_token,
+                fields=CHANGE_FIELDS,
+                pageSize=1000,
+                includeItemsFromAllDrives=True,
+                supportsAllDrives=True
+            ).execute()
+            changed.update(
+                change.get("fileId") for change in response.get("changes", [])
+                if change.get("fileId") in self._watched_ids
+            )
+            if "newStartPageToken" in response:
+                self._page_token = response["newStartPageToken"]
+            page_token = response.get("nextPageToken")
+
+        for document_id in changed:
+            self.cache.invalidate(document_id)
+        self.invalidations += len(changed)
+        self.polls += 1
+        return len(changed)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                invalidated = self.poll()
+                self._last_success = time.monotonic()
+                self.failures = 0
+                if invalidated:
+                    print(f"Prompt watcher invalidated {invalidated} changed prompt doc(s)")
+                delay = self.interval_seconds
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                print(f"Error watching prompt docs for changes: {e}")
+                if self.failures >= HEALTHY_POLLS:
+                    # The page token may be the problem: take a new one. Entries checked before it are
+                    # not covered, so the cache revalidates them itself.
+                    self._page_token = None
+                delay = min(self.interval_seconds * 2 ** self.failures, MAX_BACKOFF_SECONDS)
+            self._stop.wait(delay)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prompt-watcher", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.is_healthy(),
+            "documents": len(self.document_ids),
+            "watched": len(self._watched_ids),
+            "polls": self.polls,
+            "invalidations": self.invalidations,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+_watcher = None
+_watcher_unavailable = False
+_watcher_lock = threading.Lock()
+
+
+def get_prompt_watcher() -> Optional[PromptChangeWatcher]:
+    """The process-wide prompt watcher, if one has been started"""
+    return _watcher
+
+
+def start_prompt_watcher() -> Optional[PromptChangeWatcher]:
+    """Start the process-wide prompt watcher with the service account credentials (once per process)"""
+    global _watcher, _watcher_unavailable
+    if PROMPT_SOURCE == "bundle" or not (PROMPT_CACHE_ENABLED and PROMPT_WATCH_ENABLED):
+        return None
+
+    with _watcher_lock:
+        if _watcher is None and not _watcher_unavailable:
+            try:
+                credentials = get_service_account_credentials(WATCH_SCOPES)
+            except Exception as e:
+                # Without a service account the prompt cache keeps revalidating on its own
+                print(f"Error creating prompt watcher credentials, not watching prompt docs: {e}")
+                _watcher_unavailable = True
+                return None
+
+            from .google_docs_fetcher import PROMPT_DOCUMENT_IDS
+
+            cache = get_prompt_cache()
+            _watcher = PromptChangeWatcher(credentials, PROMPT_DOCUMENT_IDS.values(), cache)
+            cache.change_feed = _watcher
+            _watcher.start()
+    return _watcher
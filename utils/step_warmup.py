@@ -0,0 +1,119 @@
+"""
+Next Step Warmup
+The workflow order is fixed, so the prompt type a user will generate next is
+always known. While the current step is on screen, a background thread loads
+that step's prompt docs (meta prompt, PRD meta prompt, module prompt) into the
+shared prompt cache and counts the tokens of the session's artifacts (the
+context token counts are memoized), so the next "Generate" click goes straight
+to the model.
+"""
+
+import threading
+
+import streamlit as st
+
+from .google_auth import get_user_credentials
+from .google_docs_fetcher import get_prompt_content, prefetch_prompts
+from AI.token_utils import count_tokens
+from keys.config import PROMPT_SOURCE, PROMPT_CACHE_ENABLED, STEP_WARMUP_ENABLED
+
+# Module prompt types in workflow order (topic -> client conversation -> model deliverable -> PRD)
+WORKFLOW_PROMPT_TYPES = [
+    'topic_researcher',
+    'client_transcript',
+    'client_information',
+    'model_deliverable_researcher',
+    'model_deliverable_generation',
+    'prd_executive_summary',
+    'prd_problem_statement',
+    'prd_goals_and_success_metrics',
+    'prd_roles_and_responsibilities',
+    'prd_constraints_and_assumptions',
+    'prd_evaluation_criteria',
+    'prd_risk_and_mitigations',
+    'prd_generator'
+]
+
+
+def prompt_layers(prompt_type):
+    """Prompt docs combined for a step, in order (PRD steps add the PRD meta prompt)"""
+    if prompt_type.startswith('prd_'):
+        return ['meta_prompt', 'prd_meta_prompt', prompt_type]
+    return ['meta_prompt', prompt_type]
+
+
+def next_prompt_type(prompt_type):
+    """The prompt type of the step after prompt_type (None at the end of the workflow)"""
+    if prompt_type not in WORKFLOW_PROMPT_TYPES:
+        return None
+    index = WORKFLOW_PROMPT_TYPES.index(prompt_type)
+    return WORKFLOW_PROMPT_TYPES[index + 1] if index + 1 < len(WORKFLOW_PROMPT_TYPES) else None
+
+
+def warm_steps(credentials, prompt_types, context_texts=()):
+    """
+    Load the prompt docs of the given steps and count the context tokens
+
+    Runs without Streamlit session state (on the warmup thread).
+
+    Returns:
+        {prompt_type: True if all its prompt docs were loaded}
+    """
+    layers = list(dict.fromkeys(layer for prompt_type in prompt_types for layer in prompt_layers(prompt_type)))
+    if PROMPT_SOURCE == "bundle":
+        contents = {layer: get_prompt_content(layer) for layer in layers}
+    else:
+        contents = prefetch_prompts(credentials, layers)
+
+    # Counted again, from the memo, when the step selects its context (AI.context_retriever)
+    for text in context_texts:
+        count_tokens(text)
+    return {
+        prompt_type: all(contents.get(layer) for layer in prompt_layers(prompt_type))
+        for prompt_type in prompt_types
+    }
+
+
+def _run_step_warmup(credentials, prompt_types, context_texts):
+    try:
+        loaded = warm_steps(credentials, prompt_types, context_texts)
+        print(f"Warmed prompts for {', '.join(prompt_types)}: {loaded}")
+    except Exception as e:
+        print(f"Error warming next step: {e}")
+
+
+def start_step_warmup(prompt_type, context_data=None):
+    """
+    Warm the current step and the one after it on a background thread
+
+    Each prompt type is warmed once per session; the session's artifact
+    outputs are counted again whenever a new step is warmed.
+    """
+    if not STEP_WARMUP_ENABLED or (PROMPT_SOURCE != "bundle" and not PROMPT_CACHE_ENABLED):
+        return None
+
+    warmed = st.session_state.setdefault('warmed_prompt_types', set())
+    prompt_types = [t for t in (prompt_type, next_prompt_type(prompt_type)) if t and t not in warmed]
+    if not prompt_types:
+        return None
+
+    # Credentials and context are read here: session state is not available on the worker thread
+    credentials = get_user_credentials()
+    if not credentials and PROMPT_SOURCE != "bundle":
+        return None
+
+    context_texts = [str(value) for value in (context_data or {}).values() if value]
+    for section_data in st.session_state.get('session_data', {}).values():
+        if isinstance(section_data, dict):
+            context_texts += [value for field, value in section_data.items()
+                              if field.endswith('_output') and isinstance(value, str) and value.strip()]
+
+    warmed.update(prompt_types)
+    thread = threading.Thread(
+        target=_run_step_warmup,
+        args=(credentials, prompt_types, list(dict.fromkeys(context_texts))),
+        name="step-warmup",
+        daemon=True
+    )
+    thread.start()
+    return thread